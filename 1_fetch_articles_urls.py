@@ -10,14 +10,20 @@ import os
 from urllib.parse import urlencode, urlparse
 
 import feedparser
-from datetime import datetime, timedelta
-from dateutil import parser
+import numpy as np
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
 from requests.exceptions import HTTPError, RequestException
 
+from src._caches import FeedValidatorStore, RedirectCache
+from src._concurrency import run_concurrently
+from src._dedup import cluster_near_duplicates
+from src._dates import parse_feed_date
 from src._drv_mongodb import MongoCnx
-from src._drv_scrapers import CustomRequests
+from src._drv_scrapers import CustomRequestsPool
+from src._gnews_decoder import GoogleNewsDecoder
+from src._known_ids import KnownIdIndex
 
 # Load variables from .env
 load_dotenv()
@@ -28,35 +34,18 @@ proxy_port = os.getenv("PROXY_PORT")
 wsj_username = os.getenv("WSJ_USERNAME")
 wsj_password = os.getenv("WSJ_PASSWORD")
 bing_apikey = os.getenv("BING_APIKEY")
+rss_max_workers = int(os.getenv("RSS_MAX_WORKERS", 8))
+rss_max_per_host = int(os.getenv("RSS_MAX_PER_HOST", 4))
+redirect_max_workers = int(os.getenv("REDIRECT_MAX_WORKERS", 4))
+requests_pool_size = int(os.getenv("REQUESTS_POOL_SIZE", 2))  # Sessions per proxy endpoint
 # print(proxy_username, proxy_password, proxy_server, proxy_port, wsj_username, wsj_password, bing_apikey, openai_apikey)  # noqa
 
 html_files_path, json_files_path = "./html_files", "./json_files"
+# Domains scraped by 2_parse_content.py, preferred as representatives of near-duplicate clusters
+SCRAPED_DOMAINS = ("wsj.com", "ft.com")
 [os.makedirs(path) for path in [html_files_path, json_files_path] if not os.path.exists(path)]
 
 
-def convert_date_string_to_iso(date_str):
-    """
-    Convert a date string to an ISO-8601 formatted date string.
-
-    Args:
-        date_str (str): The date string in a recognized format.
-
-    Returns:
-        str: An ISO-8601 formatted date string.
-
-    Supported date formats:
-        'Wed, 04 Oct 2023 20:00:00 GMT' and 'Wed, 04 Oct 2023 20:00:00 -0400'
-    """
-    try:
-        date_obj = parser.parse(date_str)
-        iso_date_str = date_obj.isoformat()
-
-    except ValueError as e:
-        raise ValueError(f"Invalid date format: {str(e)}.")
-
-    return iso_date_str
-
-
 def generate_google_news_rss_query(keyword, days_ago=None, language="en-US", location="US", edition="US:en", num_results=100):  # noqa
     base_url = "https://news.google.com/rss/search?"
 
@@ -84,13 +73,15 @@ def generate_google_news_rss_query(keyword, days_ago=None, language="en-US", loc
     return full_url
 
 
-def extract_commom_news_rss(handler, rss_url):
+def extract_commom_news_rss(handler, rss_url, validator_store=None):
     """
     Extracts article data from an RSS feed URL.
 
     Args:
         handler: The session handler for making HTTP requests.
         rss_url (str): The URL of the RSS feed.
+        validator_store (FeedValidatorStore): Optional store of ETag/Last-Modified/body hash to send conditional
+            requests. Feeds that did not change since the last poll are not parsed.
 
     Returns:
         dict: JSON-compatible dict containing extracted article data.
@@ -99,7 +90,15 @@ def extract_commom_news_rss(handler, rss_url):
     try:
         # Use the session object to fetch the RSS feed
         print(f"\nINFO  - Fetching articles on RSS Feed '{rss_url}'")
-        response = handler.get_response(rss_url)
+        if validator_store is not None:
+            headers = validator_store.conditional_headers(rss_url)
+            response = handler.get_response(rss_url, headers=headers)
+
+            if validator_store.is_unchanged(rss_url, response):
+                print(f"INFO  - Feed not modified since last poll (HTTP {response.status_code}), skipping.")
+                return []
+        else:
+            response = handler.get_response(rss_url)
         # response.raise_for_status()
 
         feed_content = response.text
@@ -116,9 +115,9 @@ def extract_commom_news_rss(handler, rss_url):
             clean_url = parsed_url.scheme + '://' + parsed_url.netloc + parsed_url.path
             url_hash = hashlib.md5(clean_url.encode()).hexdigest()
 
-            # Convert date from "Sat, 30 Sep 2023 02:33:34 -0400" inti ISO format
+            # Convert date from "Sat, 30 Sep 2023 02:33:34 -0400" into UTC datetime
             pubDdate = entry.get("published", "")
-            published_date = convert_date_string_to_iso(pubDdate)
+            published_date = parse_feed_date(pubDdate)
 
             # Extract article data
             extracted_entry = {
@@ -175,15 +174,16 @@ def extract_google_news_rss(handler, rss_url):
             parsed_url = urlparse(source_url)
             domain = parsed_url.netloc.replace("www.", "")
 
-            # Convert date from "Sat, 30 Sep 2023 02:33:34 -0400" inti ISO format
+            # Convert date from "Sat, 30 Sep 2023 02:33:34 -0400" into UTC datetime
             pubDdate = entry.get("published", "")
-            published_date = convert_date_string_to_iso(pubDdate)
+            published_date = parse_feed_date(pubDdate)
 
             # Extract article data
             extracted_entry = {
                 "_id": url_hash,
                 "source": "Google News",
                 "domain": domain,
+                "publisher": entry.source.get("title", ""),
                 "publish_date": published_date,
                 "title": entry.get("title", ""),
                 "url": url,
@@ -201,25 +201,139 @@ def extract_google_news_rss(handler, rss_url):
         return {}
 
 
+def fetch_rss_feeds(handler, extract_func, rss_url_list, max_workers=rss_max_workers, max_per_host=rss_max_per_host):
+    """
+    Fetch RSS feeds concurrently and stream back the extracted entries of each feed as soon as it finishes.
+
+    Args:
+        handler: The session handler for making HTTP requests.
+        extract_func (callable): `extract_commom_news_rss` or `extract_google_news_rss`.
+        rss_url_list (list): The URLs of the RSS feeds.
+        max_workers (int): Global limit of concurrent requests. Use 1 to fetch feeds serially.
+        max_per_host (int): Limit of concurrent requests to the same host.
+
+    Returns:
+        generator: List of extracted entries for each feed, in completion order.
+    """
+    def fetch(rss_url):
+        return extract_func(handler, rss_url)
+
+    for rss_url, result, error in run_concurrently(fetch, rss_url_list, max_workers, max_per_host):
+        if error is not None:
+            print(f"ERROR - Failed fetching feed '{rss_url[0:100]}': {error}")
+            continue
+        yield result
+
+
+def apply_final_url(item, final_url):
+    # Replace the Google News link with the publisher url and update "_id" hash value
+    parsed_url = urlparse(final_url)
+    clean_url = parsed_url.scheme + '://' + parsed_url.netloc + parsed_url.path
+    item["_id"] = hashlib.md5(clean_url.encode()).hexdigest()
+    item["url"] = clean_url
+    return item
+
+
+def resolve_google_news_urls(handler, news_obj_list, redirect_cache, decoder=None, max_workers=redirect_max_workers):
+    """
+    Resolve `news.google.com` links to the publisher urls. Links are decoded offline when possible, then checked on
+    the persistent cache before any request.
+
+    Args:
+        handler: The session handler for making HTTP requests.
+        news_obj_list (list): Extracted entries. Entries from other sources are kept as they are.
+        redirect_cache (RedirectCache): Persistent map of Google News url to final url.
+        decoder (GoogleNewsDecoder): Optional offline decoder of Google News article tokens.
+        max_workers (int): Limit of concurrent redirect requests for cache misses.
+
+    Returns:
+        list: Entries with resolved urls, in the original order. Entries that could not be resolved are dropped.
+    """
+    final_urls, pending_urls, pending_set = {}, [], set()  # The set for lookups, the list keeps the order
+    for item in news_obj_list:
+        url = item.get("url")
+        if urlparse(url).netloc != "news.google.com" or url in final_urls or url in pending_set:
+            continue
+        final_url = decoder.decode(url) if decoder is not None else None
+        if final_url:
+            final_urls[url] = final_url
+            continue
+        found, final_url = redirect_cache.lookup(url)
+        if found:
+            final_urls[url] = final_url
+        else:
+            pending_urls.append(url)
+            pending_set.add(url)
+
+    decoded_count = decoder.hit_count if decoder is not None else 0
+    print(f"\nINFO  - Resolving {len(pending_urls)} Google News redirects, {decoded_count} decoded offline, \
+{redirect_cache.hit_count} found on cache and {redirect_cache.negative_hit_count} cached as failed")
+
+    results = run_concurrently(handler.get_redirected_url, pending_urls, max_workers, max_per_host=max_workers)
+    for index, (url, final_url, error) in enumerate(results, start=1):
+        if error is not None:
+            final_url = None
+            print(f"ERROR - {index}/{len(pending_urls)} - Could not resolve redirect for {url[0:120]}: {error}")
+        else:
+            print(f"INFO  - {index}/{len(pending_urls)} - redirect > {final_url[0:120]}")
+        final_urls[url] = final_url
+        redirect_cache.store(url, final_url)
+
+    valid_results = []
+    for item in news_obj_list:
+        url = item.get("url")
+        if url in final_urls:
+            if not final_urls[url]:
+                continue
+            item = apply_final_url(item, final_urls[url])
+        valid_results.append(item)
+
+    redirect_cache.save()
+    print(f"INFO  - Resolved {len(valid_results)}/{len(news_obj_list)} entries")
+
+    return valid_results
+
+
 def filter_news_titles(news_obj_list, keyword_list):
-    # Filter articles with keywords
+    """
+    Filter articles with keywords. All titles are scored against all keywords in a single `rapidfuzz` batch call.
+
+    Args:
+        news_obj_list (list): Extracted entries with a "title" key.
+        keyword_list (list): Keyword documents with "keyword" and optional "match_threshold" (default 80).
+
+    Returns:
+        list: Matching entries. "keyword" is the first matching keyword on `keyword_list` order and
+        "keyword_matches" holds every matching keyword with its score.
+    """
     print(f"\nINFO  - Filtering {len(news_obj_list)} items for keywords.")
     filtered_list = []
 
-    for news_item in news_obj_list:
-        title = news_item.get("title", "").lower()  # Convert title to lowercase
+    if not news_obj_list or not keyword_list:
+        print(f"INFO  - Found {len(filtered_list)} matches.")
+        return filtered_list
+
+    titles = [news_item.get("title", "").lower() for news_item in news_obj_list]  # Convert title to lowercase
+    keywords = [item["keyword"].lower() for item in keyword_list]
+    thresholds = np.array([item.get("match_threshold", 80) for item in keyword_list])
 
-        for item in keyword_list:
-            keyword = item["keyword"].lower()
-            threshold = item.get("match_threshold", 80)
-            ratio = fuzz.partial_ratio(keyword, title)
-            # print("DEBUG - ", keyword, threshold, title)
+    # Matrix of shape (titles, keywords) with fuzz.partial_ratio(keyword, title) scores
+    scores = process.cdist(keywords, titles, scorer=fuzz.partial_ratio, workers=-1).T
+    matches = scores >= thresholds
 
-            if ratio >= threshold:
-                news_item['keyword'] = keyword  # Add the matching keyword to news_item
-                filtered_list.append(news_item)
-                print(f"INFO  - '{keyword}' match with ~{ratio:.0f} on '{title[0:100]}'")
-                break  # Exit the loop once a match is found
+    for idx, news_item in enumerate(news_obj_list):
+        matched_idx = np.flatnonzero(matches[idx])
+        if matched_idx.size == 0:
+            continue
+
+        keyword, ratio = keywords[matched_idx[0]], scores[idx, matched_idx[0]]
+        news_item['keyword'] = keyword  # Add the first matching keyword to news_item
+        news_item['keyword_matches'] = [
+            {"keyword": keywords[k], "score": round(float(scores[idx, k]), 1)} for k in matched_idx
+        ]
+        filtered_list.append(news_item)
+        print(f"INFO  - '{keyword}' match with ~{ratio:.0f} on '{titles[idx][0:100]}' \
+({len(matched_idx)} keywords matched)")
 
     print(f"INFO  - Found {len(filtered_list)} matches.")
 
@@ -305,8 +419,10 @@ def request_bing_news_urls(handler, query, results_count=100, freshness="day"):
 
 if __name__ == "__main__":
     # =============== 0. INITIAL CONFIG ===============
-    handler = CustomRequests(username=proxy_username, password=proxy_password,
-                             endpoint=proxy_server, port=proxy_port)
+    # PROXY_SERVER accepts a comma separated list of endpoints
+    proxy_list = [(proxy_username, proxy_password, endpoint.strip(), proxy_port)
+                  for endpoint in proxy_server.split(",")]
+    handler = CustomRequestsPool(proxy_list, sessions_per_proxy=requests_pool_size)
     mongo_cnx = MongoCnx("news_db")
 
     # Keywords search list
@@ -324,12 +440,17 @@ if __name__ == "__main__":
 
     collection = mongo_cnx.db['sources']
     commom_rss_url_list = collection.distinct("rss_list", {"active": True})
+    feed_validators = FeedValidatorStore(f"{json_files_path}/rss_validators.json")
+
+    def extract_commom_news_rss_cached(handler, rss_url):
+        return extract_commom_news_rss(handler, rss_url, validator_store=feed_validators)
 
     # Fetch urls in commom news RSS
     commom_rss_results = []
-    for rss_url in commom_rss_url_list:
-        result = extract_commom_news_rss(handler, rss_url)
+    for result in fetch_rss_feeds(handler, extract_commom_news_rss_cached, commom_rss_url_list):
         commom_rss_results.extend(result)
+    print(f"INFO  - Feeds not modified: {feed_validators.not_modified_count} (HTTP 304), \
+{feed_validators.same_body_count} (same body), changed: {feed_validators.changed_count}")
     # print("\n".join([f"DEBUG - {item['url']}" for item in commom_rss_results]))
     print(f"DEBUG - Found {len(commom_rss_results)} results in commom RSS")
 
@@ -345,8 +466,7 @@ if __name__ == "__main__":
 
     # Fetch urls in Goggle News Search RSS
     google_rss_results = []
-    for rss_url in google_rss_url_list:
-        result = extract_google_news_rss(handler, rss_url)
+    for result in fetch_rss_feeds(handler, extract_google_news_rss, google_rss_url_list):
         google_rss_results.extend(result)
     # print("\n".join([f"DEBUG - {item['url']}" for item in google_rss_results]))
     print(f"DEBUG - Found {len(google_rss_results)} results in Google News")
@@ -389,12 +509,15 @@ if __name__ == "__main__":
     all_results = first_list + second_list
     print(f"DEBUG - Found {len(all_results)} total results")
 
+    # Drop articles already ingested before redirect resolution, fuzzy matching and inserts
+    days_ago = 10
+    date_obj = datetime.now(timezone.utc) - timedelta(days=days_ago)
+    known_ids = KnownIdIndex.from_mongo(mongo_cnx, ["news_unprocessed", "news"], start_publish_date=date_obj)
+    all_results = known_ids.drop_known(all_results, step="feed parsing")
+
     # Filter out dates before
     date_results = []
-    days_ago = 10
-    date_obj = datetime.now() - timedelta(days=days_ago)
-    iso_date_str = date_obj.isoformat()    # print(iso_date_str)
-    date_results = [item for item in all_results[:] if item["publish_date"] >= iso_date_str]
+    date_results = [item for item in all_results[:] if item["publish_date"] >= date_obj]
     # print("\n".join([f"DEBUG - {item['url']}" for item in date_results]))
     print(f"\nINFO  - Found {len(date_results)} entries with valid publish dates")
 
@@ -405,27 +528,22 @@ if __name__ == "__main__":
     print(f"\nINFO  - Found {len(domain_results)} entries with valid domains")
 
     # Get redirected urls and update "_id" hash value
-    valid_results = []
+    redirect_cache = RedirectCache(f"{json_files_path}/redirect_cache.json")
+    gnews_decoder = GoogleNewsDecoder()
+    valid_results = resolve_google_news_urls(handler, domain_results, redirect_cache, decoder=gnews_decoder)
+    print(f"INFO  - Offline decoder hits: {gnews_decoder.hit_count}, misses: {gnews_decoder.miss_count}")
+    valid_results = known_ids.drop_known(valid_results, step="redirect resolution")
+    known_ids.report()
+    handler.report()
 
-    for index, item in enumerate(domain_results, start=1):
-        initial_url = item.get("url")
-        parsed_url_temp = urlparse(initial_url)
-        if parsed_url_temp.netloc == "news.google.com":
-            final_url = handler.get_redirected_url(initial_url)
-            parsed_url = urlparse(final_url)
-            clean_url = parsed_url.scheme + '://' + parsed_url.netloc + parsed_url.path
-            url_hash = hashlib.md5(clean_url.encode()).hexdigest()
-
-            item["_id"] = url_hash
-            item["url"] = clean_url
-            print(f"INFO  - {index}/{len(domain_results)}  - redirect > {final_url[0:120]}")
-
-        valid_results.append(item)
+    # Cluster syndicated stories, only representatives go through scraping and OpenAI stages
+    cluster_near_duplicates(valid_results, max_distance=3, preferred_domains=SCRAPED_DOMAINS)
 
     # Save local JSON
-    valid_results_json = json.dumps(valid_results, ensure_ascii=False, indent=4)
+    valid_results_json = json.dumps(valid_results, ensure_ascii=False, indent=4, default=lambda obj: obj.isoformat())
 
     mongo_cnx.insert_documents("news_unprocessed", valid_results)
+    feed_validators.save()  # Only keep validators after the entries are safely stored
 
     with open(f"{json_files_path}/valid_results_json.json", "w", encoding="utf-8") as file:
         file.write(valid_results_json)
@@ -438,6 +556,7 @@ if __name__ == "__main__":
     filtered_results = []
     filtered_results = filter_news_titles(valid_results, keyword_list)
     print(f"\nINFO  - Found {len(filtered_results)} entries with valid titles")
+    cluster_near_duplicates(filtered_results, max_distance=3, preferred_domains=SCRAPED_DOMAINS)
 
     # Insert matches on mongodb "news_db.news"
 
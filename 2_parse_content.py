@@ -4,23 +4,31 @@ v.2023-10-02
 '''
 import json
 import os
-import re
-import string
-import sys
-from datetime import datetime, timedelta
+import threading
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from itertools import chain
 from time import sleep
 
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
-from random import randint  # noqa
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from src._archive import HtmlArchive
+from src._checkpoint import ResultJournal
+from src._concurrency import run_concurrently
 from src._decorators import retry
 from src._drv_mongodb import MongoCnx
-from src._drv_scrapers import CustomRequests, CustomWebDriver
+from src._drv_scrapers import CustomRequests, CustomWebDriver, WebDriverPool, block_resources
+from src._failures import failure_entry
+from src._html_parsers import BeautifulSoupParser, get_parser
+from src._scheduler import DomainScheduler
+from src._selectors import ARTICLE_SELECTORS, SelectorRegistry
+from src._sessions import LoginSessionStore
+from src._text import clean_paragraphs
 
 # Load variables from .env
 load_dotenv()
@@ -31,20 +39,20 @@ proxy_port = os.getenv('PROXY_PORT')
 wsj_username = os.getenv('WSJ_USERNAME')
 wsj_password = os.getenv('WSJ_PASSWORD')
 bing_apikey = os.getenv('BING_APIKEY')
+webdriver_pool_size = int(os.getenv('WEBDRIVER_POOL_SIZE', 2))
+webdriver_profile = os.getenv('WEBDRIVER_PROFILE', 'default')  # 'lean' runs headless and blocks heavy resources
+browser_fetch_mode = os.getenv('BROWSER_FETCH_MODE', 'targeted')  # Wait for the article element, or 'page' <body>
+archive_full_pages = os.getenv('ARCHIVE_FULL_PAGES', 'true').lower() == 'true'  # 'false' archives the element only
+checkpoint_batch_size = int(os.getenv('CHECKPOINT_BATCH_SIZE', 20))
+checkpoint_seconds = float(os.getenv('CHECKPOINT_SECONDS', 60))
+fetch_mode = os.getenv('FETCH_MODE', 'browser')  # 'http' fetches with browser cookies, browser only as fallback
+html_parser = get_parser(os.getenv('HTML_PARSER', 'html.parser'))  # Or 'lxml', 'selectolax', 'bs4-lxml'
+soup_parser = BeautifulSoupParser()  # For BeautifulSoup objects of `fetch_page_soup` and `CustomRequests.fetch_soup`
 # print("DEBUG - ", proxy_username, proxy_password, proxy_server, proxy_port, wsj_username, wsj_password, bing_apikey, openai_apikey) # noqa
 
 html_files_path, json_files_path = "./html_files", "./json_files"
 [os.makedirs(path) for path in [html_files_path, json_files_path] if not os.path.exists(path)]
-
-
-def clean_text(text_str):
-    text_str = re.sub(r'\n', ' ', text_str)
-    text_str = ' '.join(text_str.split())
-
-    valid_chars = set(string.printable)
-    cleaned_text = ''.join(char for char in text_str if char in valid_chars)
-
-    return cleaned_text
+html_archive = HtmlArchive("./html_archive")
 
 
 def get_redirected_url(url):
@@ -170,7 +178,7 @@ def login_wsj(driver):
 
 
 @retry()
-def fetch_page_soup(driver, url):
+def fetch_page_source(driver, url):
     """
     Navigate to a url and fetch page_source.
 
@@ -179,7 +187,7 @@ def fetch_page_soup(driver, url):
     - url (str) URL to be saved
 
     Returns:
-    - HTML page content.
+    - str: HTML page content.
     """
     try:
         print(f"\nINFO  - Navigating to {url}")
@@ -189,227 +197,388 @@ def fetch_page_soup(driver, url):
         WebDriverWait(driver, 20).until(body_element)
         print("INFO  - Page <body> was loaded!")
 
-        # Parse the HTML content of the page using BeautifulSoup
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, 'html.parser')
-
-        if soup:
-            print("INFO  - Fetched BeautifulSoup HTML content")
-
-        return soup
+        return driver.page_source
 
     except TimeoutException:
         print("ERROR - Timed out waiting for page to load")
         raise Exception
 
 
-def parse_article_text(soup, domain):
+# Returns the text length of the first element matching one of the selectors with text, or 0
+ARTICLE_TEXT_LENGTH_SCRIPT = """
+for (const selector of arguments[0]) {
+    let element = null;
+    try { element = document.querySelector(selector); } catch (e) { continue; }
+    const length = element ? element.textContent.trim().length : 0;
+    if (length) { return length; }
+}
+return 0;
+"""
+
+# Returns outerHTML of the first element matching one of the selectors with text, or null
+FIND_ARTICLE_SCRIPT = """
+for (const selector of arguments[0]) {
+    let element = null;
+    try { element = document.querySelector(selector); } catch (e) { continue; }
+    if (element && element.textContent.trim()) { return element.outerHTML; }
+}
+return null;
+"""
+
+
+class article_text_settled:
+    """
+    Expected condition of an article element with text, unchanged over consecutive polls, so half-rendered bodies
+    are not captured. Texts of at least `min_length` characters are taken after one unchanged poll, shorter ones
+    after `settle_polls`.
+    """
 
-    # 0. Initial settings
-    mongo_cnx = MongoCnx("news_db")
+    def __init__(self, css_selectors, min_length=500, settle_polls=2):
+        self.css_selectors = list(css_selectors)
+        self.min_length = min_length
+        self.settle_polls = settle_polls
+        self.last_length = 0
+        self.stable_polls = 0
 
-    # Extract TXT from article body
-    collection = mongo_cnx.db["selectors"]
-    selector = collection.find_one({"domain": domain})
+    def __call__(self, driver):
+        length = driver.execute_script(ARTICLE_TEXT_LENGTH_SCRIPT, self.css_selectors)
+        self.stable_polls = self.stable_polls + 1 if length and length == self.last_length else 0
+        self.last_length = length
+        required_polls = 1 if length >= self.min_length else self.settle_polls
+        return length if self.stable_polls >= required_polls else False
 
-    if selector["selector"] == "element":
-        element = soup.find(selector["element"])
 
-    if selector["selector"] == "class":
-        # element = soup.find(selector["element"], class_=selector["class"])
-        element_list = soup.select(f'{selector["element"]}[class*="{selector["class"]}"]')
-        element = element_list[0]
+@retry()
+def fetch_article_source(driver, url, css_selectors, timeout=20, min_length=500, full_page=True):
+    """
+    Navigate to a url, wait until an article selector matches an element whose text stopped changing, and fetch only
+    that element, instead of waiting for and serializing the whole page.
 
-    if selector["selector"] == "id":
-        element = soup.find(selector["element"], id=selector["id"])
+    Args:
+    - driver (object) Selenium Chrome webdriver object.
+    - url (str) URL to be saved
+    - css_selectors (tuple) Article selectors of the domain, in order of preference.
+    - timeout (int) Seconds to wait for the article element.
+    - min_length (int) Characters of text after which the article element is taken as soon as it stops changing.
+    - full_page (bool) Also fetch the full page_source, e.g. to archive pages that can be re-extracted later.
 
-    if selector["selector"] == "data-test":
-        element = soup.find(selector["element"], attrs={"data-test": selector["data-test"]})
+    Returns:
+    - tuple: HTML of the article element, None if no selector matched before `timeout`, and HTML of the whole
+      page, None if not `full_page` and the article element was found.
+    """
+    print(f"\nINFO  - Navigating to {url}")
+    driver.get(url)
 
-    cleaned_text = clean_text(element.text)
+    try:
+        text_length = WebDriverWait(driver, timeout, poll_frequency=0.5).until(
+            article_text_settled(css_selectors, min_length=min_length))
+        article_html = driver.execute_script(FIND_ARTICLE_SCRIPT, list(css_selectors))
+        print(f"INFO  - Article element was loaded ({text_length} chars of text)")
 
-    return cleaned_text
+    except TimeoutException:
+        print("INFO  - Timed out waiting for article element to settle, falling back to full page_source")
+        return None, driver.page_source
 
+    return article_html, driver.page_source if full_page else None
 
-def parse_ft_webpages(driver, collection_name, days_ago=2, status="fetched"):
 
-    # 0. Initial settings
-    mongo_cnx = MongoCnx("news_db")
-    date_obj = datetime.now() - timedelta(days=days_ago)
-    start_publish_date = date_obj.isoformat()
-    domain = "ft.com"
+def fetch_page_soup(driver, url):
+    # Parse the HTML content of the page using BeautifulSoup
+    soup = BeautifulSoup(fetch_page_source(driver, url), 'html.parser')
+    print("INFO  - Fetched BeautifulSoup HTML content")
+    return soup
 
-    # 1. list articles to be scraped
-    articles = mongo_cnx.get_doc_list(collection_name=collection_name, domain=domain,
-                                      start_publish_date=start_publish_date, status=status)
 
-    if articles == []:
-        print("INFO  - Exiting program. No documents where found.")
-        sys.exit()
+def get_selector_registry():
+    """
+    Load article selectors from Mongodb once per run, shared by all parse functions and browser workers.
+    """
+    global selector_registry
+    with selector_registry_lock:
+        if selector_registry is None:
+            selector_registry = SelectorRegistry.from_mongo(MongoCnx("news_db"), defaults=ARTICLE_SELECTORS)
+    return selector_registry
 
-    print("INFO  - Last document _id:", articles[-1]["_id"], ", publish_date:",
-          articles[-1]["publish_date"], "url:", articles[-1]["url"])
 
-    # 3-A. Login to Wall Street (Journal WSJ)
-    # login_financialtimes(driver)
+def parse_article_text(soup, domain):
+    # Extract TXT from article body
+    element_text = get_selector_registry().extract_text(soup_parser, soup, domain)
+    if element_text is None:
+        raise ValueError(f"No article selector matched on page of {domain}")
 
-    # 3-B. Fetch and save page HTML soup and article_body.text
-    articles_contents = []
-    total_count = len(articles)
-    # item = articles[-1]
+    cleaned_text = clean_paragraphs(element_text)
 
-    for idx, item in enumerate(articles, start=1):
-        try:
-            file_path = f"{html_files_path}/{item['_id']}.html"
+    return cleaned_text
 
-            if os.path.exists(file_path):
-                print(f"INFO  - Found page source on {file_path}")
 
-                with open(file_path, "r", encoding="utf-8") as html_file:
-                    html_content = html_file.read()
-                soup = BeautifulSoup(html_content, 'html.parser')
+selector_registry = None
+selector_registry_lock = threading.Lock()
 
-            else:
-                # Fetch page
-                sleep_time = randint(10, 40)
-                print(f"INFO  - Sleeping for {sleep_time} seconds...")
-                sleep(sleep_time)
-                soup = fetch_page_soup(driver, item["url"])
+# URL patterns blocked by the 'lean' driver profile that a domain still needs, like {"ft.com": ["*.woff2"]}
+RESOURCE_ALLOWLISTS = {}
 
-                # Save local HTML file
-                with open(file_path, "w", encoding="utf-8") as file:
-                    file.write(soup.prettify())
-                print(f"INFO  - Saved page source on {file_path}")
+LOGIN_FUNCTIONS = {
+    "wsj.com": login_wsj,
+    "ft.com": login_financialtimes,
+}
 
-            # Extract TXT from article body
-            article_body_element = soup.find(By.ID, "article-body")
-            article_element = soup.find("article")
-            section_element = soup.find("section")
+# Login page used to probe saved sessions, page to read local storage and cookie domains of each login
+# `probe_url` is an account page, only open to logged-in users
+LOGIN_SESSIONS = {
+    "wsj.com": {"probe_url": "https://customercenter.wsj.com/view/my-account", "origin_url": "https://www.wsj.com",
+                "cookie_domains": ["wsj.com", "dowjones.com"]},
+    "ft.com": {"probe_url": "https://myaccount.ft.com/details/core/view", "origin_url": "https://www.ft.com",
+               "cookie_domains": ["ft.com"]},
+}
 
-            if article_element and article_element.text:
-                article_body_text = article_element.text
-                print("INFO  - article_body_text:", article_body_text[0:300])
 
-            elif article_body_element and article_body_element.text:
-                article_body_text = article_body_element.text
-                print("INFO  - article_body_text:", article_body_text[0:300])
+def login_domain(driver, domain, session_store=None):
+    """
+    Restore the saved session of a domain when still valid, otherwise login and save the new session.
 
-            elif section_element and section_element.text:
-                article_body_text = section_element.text
-                print("INFO  - article_body_text:", article_body_text[0:300])
+    Args:
+    - driver (object) Selenium Chrome webdriver object.
+    - domain (str) Domain with a login function, like "wsj.com".
+    - session_store (LoginSessionStore) Saved sessions. When None, always login.
 
-            else:
-                print(f"ERROR - Cant find article element on page source {item['_id']}.html ")
+    Returns:
+    - bool: True when the browser is logged in.
+    """
+    config = LOGIN_SESSIONS[domain]
+    if session_store is None:
+        LOGIN_FUNCTIONS[domain](driver)
+        return LoginSessionStore.is_logged_in(driver, config["probe_url"])
 
-            content_entry = {
-                "_id": item['_id'],
-                "content": article_body_text,
-                "status": "content_parsed",
-            }
+    with session_store.domain_lock(domain):  # Other workers wait and restore the session of the first login
+        if session_store.is_valid(domain, config["probe_url"]):
+            session_store.restore(domain, driver, config["origin_url"])
+            return True
 
-            articles_contents.append(content_entry)
+        LOGIN_FUNCTIONS[domain](driver)
+        return session_store.capture(domain, driver, config["origin_url"], config["probe_url"],
+                                     config["cookie_domains"])
 
-            print(f"INFO  - {idx}/{total_count} articles fetched and parsed content.")
 
-        except Exception as e:
-            print(f"ERROR - {idx}/{total_count} - Error fetching {item['url']}: {str(e)}")
-            continue  # Continue to the next item in case of an error
+def extract_article_body(html, domain):
+    """
+    Return the text of the first non-empty article element on page, or None if no selector matches.
+    """
+    document = html_parser.parse(html)
+    return get_selector_registry().extract_text(html_parser, document, domain, static_first=True)
 
-    with open(f"{json_files_path}/articles_contents.json", "w", encoding="utf-8") as json_file:
-        json.dump(articles_contents, json_file)
 
-    # 4. Update Mongodb with new article summaries
-    with open(f"{json_files_path}/articles_contents.json", "r", encoding="utf-8") as json_file:
-        articles_contents = json.load(json_file)
+def load_saved_page(_id):
+    """
+    Read a page from the archive. Pages still on the legacy `html_files` folder are copied to the archive on first
+    read, see `python -m src._archive migrate` to move them all at once.
+    """
+    html_content = html_archive.get(_id)
+    file_path = f"{html_files_path}/{_id}.html"
+    if html_content is None and os.path.exists(file_path):
+        with open(file_path, "r", encoding="utf-8") as html_file:
+            html_content = html_file.read()
+        html_archive.put(_id, html_content)
+    return html_content
 
-    mongo_cnx.update_collection(collection_name, articles_contents)
 
+def parse_article_page(driver, item, http_handler=None, scheduler=None):
+    """
+    Load an article page from the archive, or fetch and archive it, and extract its body text.
 
-def parse_wsj_webpages(driver, collection_name, days_ago=2, status="fetched"):
+    Args:
+    - driver (object) Selenium Chrome webdriver object. Not used for pages already saved or fetched over HTTP.
+    - item (dict) Article document with "_id", "domain" and "url".
+    - http_handler (CustomRequests) Session with the browser cookies. When given, the page is fetched over plain
+      HTTP and is only saved if the article body is found.
+    - scheduler (DomainScheduler) Per-domain rate limits, acquired right before the page is fetched.
 
-    # 0. Initial settings
-    mongo_cnx = MongoCnx("news_db")
-    date_obj = datetime.now() - timedelta(days=days_ago)
-    start_publish_date = date_obj.isoformat()
-    domain = "wsj.com"
+    Returns:
+    - dict: Content entry to be updated on Mongodb.
+    """
+    html_content = load_saved_page(item["_id"])
+
+    if html_content is not None:
+        print(f"INFO  - Found page source of {item['_id']} on archive")
+        article_body_text = extract_article_body(html_content, item["domain"])
+
+    else:
+        # Fetch page
+        if scheduler is not None:
+            scheduler.acquire(item["domain"])
+        if http_handler is not None:
+            html_content = http_handler.get_response(item["url"]).text
+            article_body_text = extract_article_body(html_content, item["domain"])
+            if not article_body_text:
+                raise ValueError(f"Cant find article element on HTTP response for {item['_id']}")
+        else:
+            if webdriver_profile == "lean":
+                block_resources(driver, item["domain"], RESOURCE_ALLOWLISTS)
+            if browser_fetch_mode == "targeted":
+                css_selectors = get_selector_registry().selectors_for(item["domain"], static_first=True)
+                article_html, page_html = fetch_article_source(driver, item["url"], css_selectors,
+                                                               full_page=archive_full_pages)
+                article_body_text = extract_article_body(article_html, item["domain"]) if article_html else None
+                if not article_body_text and page_html:
+                    article_body_text = extract_article_body(page_html, item["domain"])
+                html_content = page_html or article_html
+            else:
+                html_content = fetch_page_source(driver, item["url"])
+                article_body_text = extract_article_body(html_content, item["domain"])
 
-    # 1. list articles to be scraped
-    articles = mongo_cnx.get_doc_list(collection_name=collection_name, domain=domain,
-                                      start_publish_date=start_publish_date, status=status)
+        # Archive page as fetched, only the article element on targeted fetches without `archive_full_pages`
+        html_archive.put(item["_id"], html_content)
+        print(f"INFO  - Archived page source of {item['_id']}")
 
-    if articles == []:
-        print("INFO  - Passing. No documents where found with WSJ source.")
-        return None
+    if not article_body_text:
+        raise ValueError(f"Cant find article element on page source {item['_id']}.html")
 
-    print("INFO  - Last document _id:", articles[-1]["_id"], ", publish_date:", articles[-1]["publish_date"])
+    print("INFO  - article_body_text:", article_body_text[0:300])
 
-    # 3-A. Login to Wall Street (Journal WSJ)
-    login_wsj(driver)
+    return {
+        "_id": item['_id'],
+        "content": clean_paragraphs(article_body_text),
+        "status": "content_parsed",
+    }
 
-    # 3-B. Fetch and save page HTML soup and article_body.text
-    articles_contents = []
-    total_count = len(articles)
 
-    for idx, item in enumerate(articles, start=1):
+def parse_saved_pages(articles):
+    # Same output as `WebDriverPool.map_unordered`, for pages that don't need a browser
+    for item in articles:
         try:
-            file_path = f"{html_files_path}/{item['_id']}.html"
+            yield item, parse_article_page(None, item), None
+        except Exception as e:
+            yield item, None, e
 
-            if os.path.exists(file_path):
-                print(f"INFO  - Found page source on {file_path}")
 
-                with open(file_path, "r", encoding="utf-8") as html_file:
-                    html_content = html_file.read()
-                soup = BeautifulSoup(html_content, 'html.parser')
+def parse_pages_over_http(pool, articles, scheduler, max_workers):
+    """
+    Fetch article pages over plain HTTP with the cookies of a logged-in pool browser.
 
-            else:
-                # Fetch page
-                sleep_time = randint(10, 40)
-                print(f"INFO  - Sleeping for {sleep_time} seconds...")
-                sleep(sleep_time)
-                soup = fetch_page_soup(driver, item["url"])
+    Returns:
+    - tuple: `(results, fallback_articles)`. Articles without body on the HTTP response must be fetched by browser.
+    """
+    http_handler = CustomRequests(username=None, password=None, endpoint=None, port=None)  # Same IP as the browser
+    http_handler.import_browser_session(pool.get_driver(0))
 
-                # Save local HTML file
-                with open(file_path, "w", encoding="utf-8") as file:
-                    file.write(soup.prettify())
-                print(f"INFO  - Saved page source on {file_path}")
+    def parse_page(item):
+        return parse_article_page(None, item, http_handler=http_handler, scheduler=scheduler)
 
-            # Extract TXT from article body
-            article_element = soup.find("article")
-            section_element = soup.find("section")
+    results, fallback_articles = [], []
+    for item, content_entry, error in run_concurrently(parse_page, scheduler.interleave(articles),
+                                                       max_workers=max_workers, url_getter=lambda item: item["url"]):
+        if error is not None:
+            print(f"INFO  - HTTP fetch failed for {item['url']}, falling back to browser: {error}")
+            fallback_articles.append(item)
+        else:
+            results.append((item, content_entry, None))
 
-            if article_element and article_element.text:
-                article_body_text = article_element.text
-                print("INFO  - article_body_text:", article_body_text[0:300])
+    print(f"INFO  - Parsed {len(results)}/{len(articles)} pages over HTTP")
+    return results, fallback_articles
 
-            elif section_element and section_element.text:
-                article_body_text = section_element.text
-                print("INFO  - article_body_text:", article_body_text[0:300])
 
-            else:
-                print(f"ERROR - Cant find article element on page source {item['_id']}.html ")
+def parse_webpages(collection_name, domains, days_ago=2, status="fetched", scheduler=None,
+                   pool_size=webdriver_pool_size, mode=fetch_mode):
+    """
+    Fetch, save and parse article pages of paywalled domains. Pages missing on the archive are fetched by a pool
+    of logged-in browsers, interleaved across domains and rate limited per domain.
 
-            content_entry = {
-                "_id": item['_id'],
-                "content": article_body_text,
-                "status": "content_parsed",
-            }
+    Args:
+    - collection_name (str) Mongodb collection with articles to be parsed.
+    - domains (list) Domains to be parsed, like ["wsj.com", "ft.com"].
+    - days_ago (int) Parse articles published in the last days.
+    - status (str) Status of articles to be parsed.
+    - scheduler (DomainScheduler) Per-domain rate limits. Defaults to rates configured on Mongodb.
+    - pool_size (int) Number of browser workers.
+    - mode (str) 'browser' renders every page, 'http' fetches pages over HTTP with the browser cookies and uses
+      the browser only when the article body is missing.
 
-            articles_contents.append(content_entry)
+    Returns:
+    - None.
+    """
+    # 0. Initial settings
+    mongo_cnx = MongoCnx("news_db")
+    get_selector_registry()
+    # Results of a crashed run are written first, so the query below skips them
+    journal = ResultJournal(mongo_cnx, collection_name, f"{json_files_path}/articles_contents_{collection_name}.jsonl",
+                            batch_size=checkpoint_batch_size, flush_seconds=checkpoint_seconds)
+    date_obj = datetime.now(timezone.utc) - timedelta(days=days_ago)
+    start_publish_date = date_obj.isoformat()
+
+    # 1. list articles to be scraped
+    articles = []
+    for domain in domains:
+        articles.extend(mongo_cnx.get_doc_list(collection_name=collection_name, domain=domain,
+                                               start_publish_date=start_publish_date, status=status))
+
+    if articles == []:
+        print(f"INFO  - Passing. No documents where found with domains {domains}.")
+        journal.close()
+        return None
+
+    print("INFO  - Last document _id:", articles[-1]["_id"], ", publish_date:", articles[-1]["publish_date"])
+
+    # 2. Pages already saved are parsed first, the others are fetched in scheduled order
+    cached_ids = html_archive.existing_ids(item["_id"] for item in articles)
+    cached_ids.update(item["_id"] for item in articles if item["_id"] not in cached_ids
+                      and os.path.exists(f"{html_files_path}/{item['_id']}.html"))  # Not migrated yet
+    cached_articles = [item for item in articles if item["_id"] in cached_ids]
+    fetch_articles = [item for item in articles if item["_id"] not in cached_ids]
+    print(f"INFO  - Found {len(cached_articles)} saved pages, {len(fetch_articles)} pages to fetch")
+
+    # 3-A. Each browser worker restores saved sessions or logs in once to the domains with pages to fetch
+    login_domains = sorted({item["domain"] for item in fetch_articles} & set(LOGIN_FUNCTIONS))
+    session_store = LoginSessionStore.from_env()
+
+    # Failures on domains a worker could not log in to are caused by the session, not by the articles
+    session_failed_domains = set()
+
+    def login_worker(driver):
+        for domain in login_domains:
+            if not login_domain(driver, domain, session_store):
+                print(f"ERROR - Browser is not logged in to '{domain}', its failures won't count towards giving up")
+                session_failed_domains.add(domain)
+
+    scheduler = scheduler or DomainScheduler.from_mongo(mongo_cnx)
+    pool = WebDriverPool(size=min(pool_size, max(len(fetch_articles), 1)), setup=login_worker,
+                         profile=webdriver_profile, resource_allowlists=RESOURCE_ALLOWLISTS,
+                         username=proxy_username, password=proxy_password, endpoint=proxy_server, port=proxy_port)
+
+    # 3-B. Fetch and save page HTML soup and article_body.text, streaming contents to Mongodb
+    total_count = len(articles)
 
+    with pool, journal:
+        http_results = []
+        if mode == "http" and fetch_articles:
+            http_results, fetch_articles = parse_pages_over_http(pool, fetch_articles, scheduler, pool_size)
+
+        results = chain(parse_saved_pages(cached_articles), http_results,
+                        pool.map_unordered(partial(parse_article_page, scheduler=scheduler),
+                                           scheduler.interleave(fetch_articles)))
+
+        failed_count = 0
+        for idx, (item, content_entry, error) in enumerate(results, start=1):
+            if error is not None:
+                print(f"ERROR - {idx}/{total_count} - Error fetching {item['url']}: {str(error)}")
+                # Failed articles are skipped by `get_doc_list` until their backoff ends
+                journal.append(failure_entry(item, error, counted=item["domain"] not in session_failed_domains))
+                failed_count += 1
+                continue  # Continue to the next item in case of an error
+
+            if item.get("failure"):
+                content_entry["failure"] = None
+            journal.append(content_entry)
             print(f"INFO  - {idx}/{total_count} articles fetched and parsed content.")
 
-        except Exception as e:
-            print(f"ERROR - {idx}/{total_count} - Error fetching {item['url']}: {str(e)}")
-            continue  # Continue to the next item in case of an error
+    if failed_count:
+        print(f"INFO  - {failed_count}/{total_count} articles failed, recorded with their next eligible time")
 
-    with open(f"{json_files_path}/articles_contents.json", "w", encoding="utf-8") as json_file:
-        json.dump(articles_contents, json_file)
 
-    # 4. Update Mongodb with new article summaries
-    with open(f"{json_files_path}/articles_contents.json", "r", encoding="utf-8") as json_file:
-        articles_contents = json.load(json_file)
+def parse_ft_webpages(collection_name, days_ago=2, status="fetched", pool_size=webdriver_pool_size):
+    return parse_webpages(collection_name, ["ft.com"], days_ago=days_ago, status=status, pool_size=pool_size)
 
-    mongo_cnx.update_collection(collection_name, articles_contents)
+
+def parse_wsj_webpages(collection_name, days_ago=2, status="fetched", pool_size=webdriver_pool_size):
+    return parse_webpages(collection_name, ["wsj.com"], days_ago=days_ago, status=status, pool_size=pool_size)
 
 
 def parse_free_webpages(start_publish_date, domain=None):
@@ -450,18 +619,10 @@ def parse_free_webpages(start_publish_date, domain=None):
             session = CustomRequests(proxy_username, proxy_password, proxy_server, proxy_port)
             soup = session.fetch_soup(item["url"])
 
-            # Save local HTML file
-            html_file_path = f"{html_files_path}/{item['_id']}.html"
-            with open(html_file_path, "w", encoding="utf-8") as file:
-                file.write(soup.prettify())
+            # Archive page
+            html_archive.put(item["_id"], str(soup))
 
             # Extract TXT from article body
-            collection = mongo_cnx.db["selectors"]  # DEBUG
-            selector = collection.find_one({"domain": domain})  # DEBUG
-            print(selector)  # DEBUG
-
-            element = soup.find("article")  # DEBIG
-            article_body_text = element.text  # DEBUG
             article_body_text = parse_article_text(soup=soup, domain=item['domain'])
             print(f"DEBUG - article_body_text: {article_body_text[0:500]}...")
 
@@ -501,21 +662,16 @@ def parse_free_webpages(start_publish_date, domain=None):
 
 if __name__ == "__main__":
 
-    handler = CustomWebDriver(username=proxy_username, password=proxy_password,
-                              endpoint=proxy_server, port=proxy_port)
-    driver = handler.open_driver()
-
     collection_name = "news_unprocessed"
     days_ago = 10
     status = "fetched"
 
-    # Parse WSJ
-    parse_wsj_webpages(driver=driver, collection_name=collection_name, days_ago=days_ago, status=status)
+    # Parse WSJ and Financial Times, interleaving requests to both domains
+    parse_webpages(collection_name=collection_name, domains=["wsj.com", "ft.com"], days_ago=days_ago, status=status)
 
-    # Parse Financial Times
-    login_financialtimes(driver)
-
-    parse_ft_webpages(driver=driver, collection_name=collection_name, days_ago=days_ago, status=status)
+    # Near-duplicates inherit the content of their cluster representative
+    mongo_cnx = MongoCnx("news_db")
+    mongo_cnx.inherit_cluster_results(collection_name, ["content", "status"])
 
     # # Parse FREE news_sites
     # valid_domains = [
@@ -4,36 +4,29 @@ v.2023-10-02
 '''
 import json
 import os
-import re
-import string
 import sys
 from datetime import datetime  # noqa
 
 import openai
 from dotenv import load_dotenv
 
+from src._checkpoint import ResultJournal
+from src._dedup import cluster_near_duplicates
 from src._drv_mongodb import MongoCnx
+from src._text import TextNormalizer, clean_text
 
 
 # Load variables from .env
 load_dotenv()
 openai_apikey = os.getenv("OPENAI_APIKEY")
+checkpoint_batch_size = int(os.getenv('CHECKPOINT_BATCH_SIZE', 20))
+checkpoint_seconds = float(os.getenv('CHECKPOINT_SECONDS', 60))
 # print("DEBUG - ", proxy_username, proxy_password, proxy_server, proxy_port, wsj_username, wsj_password, bing_apikey, openai_apikey) # noqa
 
 html_files_path, json_files_path = "./html_files", "./json_files"
 [os.makedirs(path) for path in [html_files_path, json_files_path] if not os.path.exists(path)]
 
 
-def clean_text(text_str):
-    text_str = re.sub(r'\n', ' ', text_str)
-    text_str = " ".join(text_str.split())
-
-    valid_chars = set(string.printable)
-    cleaned_text = "".join(char for char in text_str if char in valid_chars)
-
-    return cleaned_text
-
-
 def openai_score_text(input_text, keyword_list):
     try:
         print("INFO  - Querying OpenAI to rate article text with keywords.")
@@ -78,62 +71,78 @@ if __name__ == "__main__":
 
     # 0. Initial settings
     mongo_cnx = MongoCnx("news_db")
-    file_path = f"{json_files_path}/articles_scores.json"
+    # Scores of a crashed run are written first, so the query below skips them
+    journal = ResultJournal(mongo_cnx, "news", f"{json_files_path}/articles_scores.jsonl",
+                            batch_size=checkpoint_batch_size, flush_seconds=checkpoint_seconds)
 
     # 1. list articles to be scored
     collection = mongo_cnx.db["news"]
 
     query = {
         'score': {'$exists': False},  # Check for the absence of 'score'
-        'content': {'$exists': True}   # Check for the presence of 'content'
+        'content': {'$exists': True},  # Check for the presence of 'content'
+        'duplicate_of': {'$exists': False},  # Near-duplicates inherit the score of their representative
     }
-    projection = {"_id": 1, "publish_date": 1, "title": 1, "content": 1}
+    projection = {"_id": 1, "publish_date": 1, "title": 1, "domain": 1, "content": 1}
 
-    cursor = collection.find(query, projection=projection)
-    articles_list = [document for document in cursor]
+    # Only the cleaned texts are kept for clustering, contents are streamed again by the scoring loop
+    articles_list = []
+    for document in collection.find(query, projection=projection):
+        document["text"] = clean_text(document.pop("content"))
+        articles_list.append(document)
     # print("INFO  - Document list:", articles_list)
 
     if articles_list == []:
         print("INFO  - Exiting program. No documents where found.")
+        journal.close()
         sys.exit(1)
 
     print("INFO  - Last document _id:", articles_list[-1]["_id"], ", publish_date:", articles_list[-1]["publish_date"])
 
+    # 1-B. Cluster near-duplicate contents, only representatives are scored
+    articles_list, duplicates_list = cluster_near_duplicates(
+        articles_list, text_func=lambda item: item["text"], max_distance=3, shingle_size=3, match_key_terms=False)
+    if duplicates_list:
+        mongo_cnx.update_collection("news", [
+            {"_id": item["_id"], "cluster_id": item["cluster_id"], "duplicate_of": item["duplicate_of"]}
+            for item in duplicates_list])
+
+    total_count = len(articles_list)
+    del articles_list
+
     # 2. Keywords search list
     keyword_collection = mongo_cnx.db["keywords"]
-    query = keyword_collection.find({"active": True}, {"keyword": 1}).sort("keyword", 1)
-    keyword_list = [document.get("keyword") for document in query]
+    keyword_query = keyword_collection.find({"active": True}, {"keyword": 1}).sort("keyword", 1)
+    keyword_list = [document.get("keyword") for document in keyword_query]
     print("INFO  - Keyword list:", keyword_list)
 
-    # 3. Rate article text with OpenAI
-    result_list = []
-    total_count = len(articles_list)
+    # 3. Rate article text with OpenAI, streaming articles from Mongodb and scores to Mongodb
+    normalizer = TextNormalizer.from_file()
+    # Members marked above are now excluded by the query, the cursor stays open during the slow OpenAI calls
+    cursor = collection.find(query, projection=projection, no_cursor_timeout=True)
 
-    for idx, item in enumerate(articles_list, start=1):
-        print(f'\nINFO  - {idx}/{total_count}  - fetching document {item["_id"]}, `{item["title"][0:120]}`.')
-        try:
-            # Send article text to openai and fetch summary
-            article_body_text = item["content"]
-            cleaned_text = clean_text(article_body_text)
-            response_dict = openai_score_text(cleaned_text, keyword_list)
+    with journal, cursor:
+        for idx, item in enumerate(cursor, start=1):
+            print(f'\nINFO  - {idx}/{total_count}  - fetching document {item["_id"]}, `{item["title"][0:120]}`.')
+            try:
+                # Send article text to openai and fetch summary
+                article_body_text = item["content"]
+                cleaned_text = normalizer.normalize(article_body_text, item.get("domain"))
+                response_dict = openai_score_text(cleaned_text, keyword_list)
 
-            document_entry = {
-                "_id": item["_id"],
-                "score": response_dict["score"],
-                "explanation": response_dict["explanation"],
-            }
-            result_list.append(document_entry)
+                document_entry = {
+                    "_id": item["_id"],
+                    "score": response_dict["score"],
+                    "explanation": response_dict["explanation"],
+                }
 
-        except Exception as e:
-            print(f'ERROR - {idx}/{total_count} - Failure fetching summary for document {item["_id"]}:', e)
-            continue  # Continue to the next item in case of an error
+            except Exception as e:
+                print(f'ERROR - {idx}/{total_count} - Failure fetching summary for document {item["_id"]}:', e)
+                continue  # Continue to the next item in case of an error
 
-    with open(file_path, "w", encoding="utf-8") as json_file:
-        json.dump(result_list, json_file)
+            journal.append(document_entry)
 
-    # 4. Update Mongodb with new article summaries
-    with open(file_path, "r", encoding="utf-8") as json_file:
-        result_list = json.load(json_file)
+    normalizer.report()
 
-    mongo_cnx = MongoCnx("news_db")
-    mongo_cnx.update_collection("news", result_list)
+    # 4. Near-duplicates inherit the scores of their representative
+    mongo_cnx.inherit_cluster_results("news", ["score", "explanation"])
@@ -0,0 +1,246 @@
+"""
+Compressed, content-addressed archive of fetched article pages, in place of one `html_files/<_id>.html` per article.
+Pages are kept as fetched (no prettify), compressed with zstd when `zstandard` is installed or gzip otherwise, and
+appended to a few large pack files. A sqlite index maps each `_id` to a content hash, and each hash to its place on a
+pack, so identical pages are stored once. Reads use memory-mapped pack files.
+
+Usage:
+    python -m src._archive migrate --source ./html_files [--remove]
+    python -m src._archive stats
+    python -m src._archive benchmark
+v.2026-10-18
+"""
+import argparse
+import glob
+import gzip
+import hashlib
+import mmap
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+PACK_SIZE = 256 * 1024 ** 2
+
+
+class HtmlArchive:
+    """
+    Thread-safe page store keyed by article `_id`.
+    """
+
+    def __init__(self, path="./html_archive", pack_size=PACK_SIZE, compression_level=10):
+        """
+        Args:
+        - path (str): Folder of the pack files and `index.sqlite`.
+        - pack_size (int): Bytes per pack file before starting a new one.
+        - compression_level (int): zstd level. Gzip uses level 6.
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.pack_size = pack_size
+        self.codec = "zstd" if zstandard is not None else "gzip"
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        self._mmaps = {}
+
+        self.cnx = sqlite3.connect(os.path.join(path, "index.sqlite"), check_same_thread=False)
+        self.cnx.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (hash TEXT PRIMARY KEY, pack INTEGER, offset INTEGER, length INTEGER,
+                                              raw_length INTEGER, codec TEXT);
+            CREATE TABLE IF NOT EXISTS pages (_id TEXT PRIMARY KEY, hash TEXT, saved_at REAL);
+            CREATE INDEX IF NOT EXISTS pages_hash ON pages (hash);
+        """)
+        self.pack_idx = self.cnx.execute("SELECT COALESCE(MAX(pack), 0) FROM blobs").fetchone()[0]
+
+    def _pack_path(self, pack_idx):
+        return os.path.join(self.path, f"pack-{pack_idx:05d}.bin")
+
+    def _compress(self, data):
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=self.compression_level).compress(data)
+        return gzip.compress(data, compresslevel=6)
+
+    @staticmethod
+    def _decompress(data, codec):
+        if codec == "zstd":
+            if zstandard is None:
+                raise ImportError("zstandard is needed to read pages archived with zstd")
+            return zstandard.ZstdDecompressor().decompress(data)
+        return gzip.decompress(data)
+
+    def __contains__(self, _id):
+        with self._lock:
+            return self.cnx.execute("SELECT 1 FROM pages WHERE _id = ?", (_id,)).fetchone() is not None
+
+    def existing_ids(self, ids):
+        """
+        Returns:
+        - set: The given `_id`s with an archived page, in a single query per 500 ids.
+        """
+        ids, found = list(ids), set()
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                query = f"SELECT _id FROM pages WHERE _id IN ({','.join('?' * len(chunk))})"
+                found.update(row[0] for row in self.cnx.execute(query, chunk))
+        return found
+
+    def put(self, _id, html):
+        """
+        Archive a page. Content already stored under another `_id` is only indexed.
+
+        Args:
+        - _id (str): Article `_id`.
+        - html (str or bytes): Page as fetched.
+
+        Returns:
+        - str: Content hash.
+        """
+        data = html.encode("utf-8") if isinstance(html, str) else html
+        content_hash = hashlib.sha256(data).hexdigest()
+
+        with self._lock:
+            if self.cnx.execute("SELECT 1 FROM blobs WHERE hash = ?", (content_hash,)).fetchone() is None:
+                compressed = self._compress(data)
+                pack_path = self._pack_path(self.pack_idx)
+                if os.path.exists(pack_path) and os.path.getsize(pack_path) + len(compressed) > self.pack_size:
+                    self.pack_idx += 1
+                    pack_path = self._pack_path(self.pack_idx)
+
+                with open(pack_path, "ab") as pack_file:
+                    offset = pack_file.tell()
+                    pack_file.write(compressed)
+                self.cnx.execute("INSERT INTO blobs VALUES (?, ?, ?, ?, ?, ?)",
+                                 (content_hash, self.pack_idx, offset, len(compressed), len(data), self.codec))
+
+            self.cnx.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?)", (_id, content_hash, time.time()))
+            self.cnx.commit()
+
+        return content_hash
+
+    def _read_blob(self, pack_idx, offset, length):
+        # Called with the lock held. Pack files only grow, so a map is reopened when it's shorter than needed.
+        mapped = self._mmaps.get(pack_idx)
+        if mapped is None or offset + length > len(mapped):
+            if mapped is not None:
+                mapped.close()
+            with open(self._pack_path(pack_idx), "rb") as pack_file:
+                mapped = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._mmaps[pack_idx] = mapped
+        return mapped[offset:offset + length]
+
+    def get(self, _id):
+        """
+        Returns:
+        - str: Archived page, or None.
+        """
+        with self._lock:
+            row = self.cnx.execute("SELECT b.pack, b.offset, b.length, b.codec FROM pages p "
+                                   "JOIN blobs b ON b.hash = p.hash WHERE p._id = ?", (_id,)).fetchone()
+            if row is None:
+                return None
+            pack_idx, offset, length, codec = row
+            compressed = self._read_blob(pack_idx, offset, length)
+
+        return self._decompress(compressed, codec).decode("utf-8")
+
+    def ids(self):
+        with self._lock:
+            return [row[0] for row in self.cnx.execute("SELECT _id FROM pages")]
+
+    def stats(self):
+        with self._lock:
+            page_count = self.cnx.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            blob_count, raw_bytes, stored_bytes = self.cnx.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_length), 0), COALESCE(SUM(length), 0) FROM blobs").fetchone()
+        pack_bytes = sum(os.path.getsize(path) for path in glob.glob(os.path.join(self.path, "pack-*.bin")))
+        return {"page_count": page_count, "blob_count": blob_count, "raw_bytes": raw_bytes,
+                "stored_bytes": stored_bytes, "pack_bytes": pack_bytes}
+
+    def report(self):
+        stats = self.stats()
+        ratio = stats["raw_bytes"] / stats["stored_bytes"] if stats["stored_bytes"] else 0
+        print(f"INFO  - Archive '{self.path}': {stats['page_count']} pages, {stats['blob_count']} unique contents, "
+              f"{stats['raw_bytes'] / 1024 ** 2:.1f} MB raw stored in {stats['pack_bytes'] / 1024 ** 2:.1f} MB "
+              f"({ratio:.1f}x, {self.codec})")
+        return stats
+
+    def close(self):
+        with self._lock:
+            for mapped in self._mmaps.values():
+                mapped.close()
+            self._mmaps = {}
+            self.cnx.close()
+
+
+def migrate_directory(archive, source_path="./html_files", remove=False):
+    """
+    Move `<_id>.html` files into the archive and print the disk savings.
+
+    Args:
+    - archive (HtmlArchive): Target archive.
+    - source_path (str): Folder with one page per article.
+    - remove (bool): Delete each file once archived.
+    """
+    file_paths = sorted(glob.glob(os.path.join(source_path, "*.html")))
+    source_bytes = 0
+    pack_bytes_before = archive.stats()["pack_bytes"]
+    start = time.perf_counter()
+
+    for idx, file_path in enumerate(file_paths, start=1):
+        with open(file_path, "rb") as html_file:
+            data = html_file.read()
+        source_bytes += os.path.getsize(file_path)
+        archive.put(os.path.basename(file_path)[:-len(".html")], data)
+        if remove:
+            os.remove(file_path)
+        if idx % 1000 == 0:
+            print(f"INFO  - {idx}/{len(file_paths)} pages archived")
+
+    added_bytes = archive.stats()["pack_bytes"] - pack_bytes_before
+    print(f"INFO  - Archived {len(file_paths)} pages in {time.perf_counter() - start:.1f}s: "
+          f"{source_bytes / 1024 ** 2:.1f} MB of files into {added_bytes / 1024 ** 2:.1f} MB of packs, "
+          f"saved {(source_bytes - added_bytes) / 1024 ** 2:.1f} MB")
+
+
+def benchmark_reads(archive, limit=None):
+    """
+    Read archived pages and print pages/s and MB/s of decompressed HTML.
+    """
+    ids = archive.ids()[:limit]
+    if not ids:
+        print("INFO  - Archive is empty")
+        return None
+
+    total_bytes = 0
+    start = time.perf_counter()
+    for _id in ids:
+        total_bytes += len(archive.get(_id))
+    elapsed = time.perf_counter() - start
+
+    print(f"INFO  - Read {len(ids)} pages in {elapsed:.2f}s: {len(ids) / elapsed:.0f} pages/s, "
+          f"{total_bytes / 1024 ** 2 / elapsed:.1f} MB/s")
+    return len(ids) / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTML archive tools")
+    parser.add_argument("command", choices=["migrate", "stats", "benchmark"])
+    parser.add_argument("--archive", default="./html_archive", help="Archive folder")
+    parser.add_argument("--source", default="./html_files", help="Folder of <_id>.html files to migrate")
+    parser.add_argument("--remove", action="store_true", help="Delete files once archived")
+    parser.add_argument("--limit", type=int, default=None, help="Pages to read on benchmark")
+    args = parser.parse_args()
+
+    html_archive = HtmlArchive(args.archive)
+    if args.command == "migrate":
+        migrate_directory(html_archive, args.source, remove=args.remove)
+    elif args.command == "benchmark":
+        benchmark_reads(html_archive, limit=args.limit)
+    html_archive.report()
+    html_archive.close()
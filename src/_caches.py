@@ -0,0 +1,150 @@
+"""
+Persistent key-value stores kept as JSON files between runs of the ETL scripts.
+`FeedValidatorStore` keeps HTTP validators (ETag, Last-Modified, body hash) to poll RSS feeds with conditional GETs.
+`RedirectCache` keeps resolved Google News redirects so they are not requested again on the next runs.
+v.2026-10-18
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class PersistentStore:
+    """
+    Thread-safe dict persisted as a JSON file. Call `.save()` to write changes to disk.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        self._data = {}
+
+        if os.path.exists(file_path):
+            try:
+                with open(file_path, "r", encoding="utf-8") as json_file:
+                    self._data = json.load(json_file)
+            except (OSError, ValueError) as e:
+                print(f"ERROR - Could not load '{file_path}', starting with an empty store: {e}")
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._data.get(key, default)
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+
+    def items(self):
+        with self._lock:
+            return list(self._data.items())
+
+    def save(self):
+        with self._lock:
+            temp_path = f"{self.file_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as json_file:
+                json.dump(self._data, json_file, ensure_ascii=False)
+            os.replace(temp_path, self.file_path)
+        print(f"INFO  - Saved {len(self._data)} entries on '{self.file_path}'")
+
+
+class FeedValidatorStore(PersistentStore):
+    """
+    Per-feed validators used to skip feeds that did not change since the last poll.
+    """
+
+    def __init__(self, file_path="./json_files/rss_validators.json"):
+        super().__init__(file_path)
+        self.not_modified_count = 0
+        self.same_body_count = 0
+        self.changed_count = 0
+
+    def conditional_headers(self, url):
+        """
+        Build `If-None-Match` / `If-Modified-Since` headers from the last response of a feed.
+        """
+        validators = self.get(url) or {}
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
+    def is_unchanged(self, url, response):
+        """
+        Check a feed response against stored validators and record the new ones.
+
+        Args:
+        - url (str): The feed URL.
+        - response (requests.Response): Response of a conditional GET.
+
+        Returns:
+        - bool: True on `304 Not Modified` or when the body is identical to the last poll.
+        """
+        # Concurrent feed polls update the counters and validators under the store lock
+        if response.status_code == 304:
+            with self._lock:
+                self.not_modified_count += 1
+            return True
+
+        body_hash = hashlib.sha1(response.content).hexdigest()
+        with self._lock:
+            previous = self._data.get(url) or {}
+            self._data[url] = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "body_hash": body_hash,
+            }
+
+            if previous.get("body_hash") == body_hash:
+                self.same_body_count += 1
+                return True
+
+            self.changed_count += 1
+            return False
+
+
+class RedirectCache(PersistentStore):
+    """
+    Map of Google News article URLs to their final publisher URLs, with TTL and negative entries for failures.
+    """
+
+    def __init__(self, file_path="./json_files/redirect_cache.json", ttl_days=30, negative_ttl_hours=12):
+        super().__init__(file_path)
+        self.ttl_seconds = ttl_days * 86400
+        self.negative_ttl_seconds = negative_ttl_hours * 3600
+        self.hit_count = 0
+        self.negative_hit_count = 0
+        self.miss_count = 0
+        self._purge_expired()
+
+    def _purge_expired(self):
+        now = time.time()
+        with self._lock:
+            self._data = {url: entry for url, entry in self._data.items() if entry.get("expires", 0) > now}
+
+    def lookup(self, url):
+        """
+        Returns:
+        - tuple: `(found, final_url)`. `final_url` is None for a cached failure (negative entry).
+        """
+        with self._lock:
+            entry = self._data.get(url)
+            if entry is None or entry.get("expires", 0) <= time.time():
+                self.miss_count += 1
+                return False, None
+
+            if entry.get("final_url") is None:
+                self.negative_hit_count += 1
+            else:
+                self.hit_count += 1
+            return True, entry.get("final_url")
+
+    def store(self, url, final_url):
+        ttl = self.ttl_seconds if final_url else self.negative_ttl_seconds
+        self.set(url, {"final_url": final_url, "expires": time.time() + ttl})
@@ -0,0 +1,106 @@
+"""
+Incremental, resumable writes of stage results to Mongodb.
+Each result is appended to a JSONL journal on disk (write-ahead log) and buffered. The buffer is written to Mongodb
+with `update_collection` every `batch_size` results or `flush_seconds`, followed by a flush marker on the journal.
+If a run crashes, the next run replays the results after the last marker, so paid OpenAI calls and browser time are
+not lost, and the stage queries skip articles that already have results. Entries are Extended JSON, so datetimes
+are replayed as dates.
+v.2026-10-18
+"""
+import json
+import os
+import time
+
+from bson import json_util
+
+FLUSH_MARKER = {"__flushed__": True}
+
+
+class ResultJournal:
+    """
+    Context manager streaming result entries (dicts with "_id") to a Mongodb collection.
+    """
+
+    def __init__(self, mongo_cnx, collection_name, journal_path, batch_size=20, flush_seconds=60):
+        """
+        Args:
+        - mongo_cnx (MongoCnx): Database connection.
+        - collection_name (str): Collection to be updated.
+        - journal_path (str): JSONL file, like "./json_files/articles_scores.jsonl".
+        - batch_size (int): Results per Mongodb bulk update.
+        - flush_seconds (float): Maximum time a result waits on the buffer.
+        """
+        self.mongo_cnx = mongo_cnx
+        self.collection_name = collection_name
+        self.journal_path = journal_path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.buffer = []
+        self.written_count = 0
+        self.last_flush = time.monotonic()
+
+        self.recover()
+        self.journal_file = open(journal_path, "a", encoding="utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def recover(self):
+        """
+        Write results of a crashed run, journaled after the last flush marker, to Mongodb.
+        """
+        if not os.path.exists(self.journal_path):
+            return
+
+        pending = []
+        with open(self.journal_path, "r", encoding="utf-8") as journal_file:
+            for line in journal_file:
+                try:
+                    entry = json_util.loads(line)
+                except ValueError:  # Line cut by the crash
+                    continue
+                if entry == FLUSH_MARKER:
+                    pending = []
+                else:
+                    pending.append(entry)
+
+        if pending:
+            print(f"INFO  - Recovering {len(pending)} results from '{self.journal_path}'")
+            for start in range(0, len(pending), self.batch_size):
+                self.mongo_cnx.update_collection(self.collection_name, pending[start:start + self.batch_size])
+        os.remove(self.journal_path)
+
+    def append(self, entry):
+        """
+        Journal a result and write the buffer to Mongodb when full or old enough.
+        """
+        self.journal_file.write(json_util.dumps(entry) + "\n")
+        self.journal_file.flush()
+        os.fsync(self.journal_file.fileno())
+
+        self.buffer.append(entry)
+        if len(self.buffer) >= self.batch_size or time.monotonic() - self.last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.mongo_cnx.update_collection(self.collection_name, self.buffer)
+            self.written_count += len(self.buffer)
+            self.journal_file.write(json.dumps(FLUSH_MARKER) + "\n")
+            self.journal_file.flush()
+            os.fsync(self.journal_file.fileno())  # A lost marker would replay the batch after a crash
+            self.buffer = []
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        """
+        Write the remaining results and remove the journal, which is only needed to recover from a crash.
+        """
+        self.flush()
+        self.journal_file.close()
+        os.remove(self.journal_path)
+        print(f"INFO  - Wrote {self.written_count} results to '{self.collection_name}' in batches of "
+              f"{self.batch_size}")
@@ -0,0 +1,119 @@
+"""
+Helpers to run blocking I/O calls (HTTP requests, page fetches) on a bounded thread pool.
+Results are streamed back in completion order, with a global concurrency limit and a per-host limit.
+v.2026-10-18
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+
+class HostLimiter:
+    """
+    Bound the number of in-flight calls to the same host across all worker threads.
+    """
+
+    def __init__(self, max_per_host=4):
+        self.max_per_host = max_per_host
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def _get_semaphore(self, host):
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._semaphores[host]
+
+    @contextmanager
+    def limit(self, url):
+        semaphore = self._get_semaphore(urlparse(url).netloc)
+        semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+
+def run_concurrently(func, items, max_workers=8, max_per_host=4, url_getter=None):
+    """
+    Call `func(item)` for every item on a thread pool and yield results as soon as each call finishes.
+
+    Args:
+    - func (callable): Blocking function to be called with a single item.
+    - items (iterable): Items to be processed, usually URLs.
+    - max_workers (int): Global limit of concurrent calls. Use 1 to run serially.
+    - max_per_host (int): Limit of concurrent calls to the same host.
+    - url_getter (callable): Returns the URL of an item, used for per-host limits. Defaults to the item itself.
+
+    Returns:
+    - generator: Tuples `(item, result, error)` in completion order. `error` is None on success.
+    """
+    url_getter = url_getter or (lambda item: item)
+    limiter = HostLimiter(max_per_host)
+
+    def limited_call(item):
+        with limiter.limit(url_getter(item)):
+            return func(item)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(limited_call, item): item for item in items}
+
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                yield item, future.result(), None
+            except Exception as e:
+                yield item, None, e
+
+
+def benchmark_run_concurrently(feed_count=40, delay_seconds=0.25, max_workers=8, max_per_host=8):
+    """
+    Compare serial and concurrent fetching against a local stub HTTP server that answers with a fixed delay.
+    """
+    import urllib.request
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class StubFeedHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay_seconds)
+            body = b'<?xml version="1.0"?><rss version="2.0"><channel><title>stub</title></channel></rss>'
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/rss+xml')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubFeedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url_list = [f'http://127.0.0.1:{server.server_port}/feed/{idx}' for idx in range(feed_count)]
+
+    def fetch(url):
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.read()
+
+    try:
+        start = time.perf_counter()
+        list(run_concurrently(fetch, url_list, max_workers=1, max_per_host=1))
+        serial_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        list(run_concurrently(fetch, url_list, max_workers=max_workers, max_per_host=max_per_host))
+        concurrent_time = time.perf_counter() - start
+    finally:
+        server.shutdown()
+
+    print(f'INFO  - Fetched {feed_count} feeds with {delay_seconds}s latency each',
+          f'INFO  - Serial: {serial_time:.2f}s',
+          f'INFO  - Concurrent ({max_workers} workers, {max_per_host} per host): {concurrent_time:.2f}s',
+          f'INFO  - Speedup: {serial_time / concurrent_time:.1f}x',
+          sep='\n')
+
+
+if __name__ == '__main__':
+
+    benchmark_run_concurrently()
@@ -0,0 +1,140 @@
+"""
+Date parsing helpers for feed entries.
+`parse_feed_date` has a fast path for the RFC-822 dates emitted by RSS feeds and Google News
+('Wed, 04 Oct 2023 20:00:00 GMT', 'Sat, 30 Sep 2023 02:33:34 -0400') and falls back to `dateutil` for other formats.
+Results are timezone-aware UTC datetimes, memoized since many entries share the same timestamp.
+v.2026-10-18
+"""
+import re
+import time
+import warnings
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+from dateutil import parser
+
+RFC822_PATTERN = re.compile(
+    r'^\s*(?:[A-Za-z]{3},\s*)?(\d{1,2})\s+([A-Za-z]{3})\s+(\d{2,4})\s+(\d{1,2}):(\d{2})(?::(\d{2}))?'
+    r'\s*([+-]\d{4}|[A-Za-z]{1,5})?\s*$')
+
+MONTHS = {month: idx for idx, month in enumerate(
+    ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'], start=1)}
+
+# Zone names allowed by RFC-822, as hours offset from UTC
+TZ_NAMES = {
+    'gmt': 0, 'ut': 0, 'utc': 0, 'z': 0,
+    'est': -5, 'edt': -4, 'cst': -6, 'cdt': -5, 'mst': -7, 'mdt': -6, 'pst': -8, 'pdt': -7,
+}
+
+
+def _parse_rfc822(date_str):
+    match = RFC822_PATTERN.match(date_str)
+    if match is None:
+        return None
+
+    day, month_name, year, hour, minute, second, zone = match.groups()
+    month = MONTHS.get(month_name.lower())
+    if month is None:
+        return None
+
+    year = int(year)
+    if year < 100:
+        year += 2000 if year < 50 else 1900
+
+    if zone is None:
+        offset = timedelta(0)
+    elif zone[0] in '+-':
+        sign = -1 if zone[0] == '-' else 1
+        offset = sign * timedelta(hours=int(zone[1:3]), minutes=int(zone[3:5]))
+    elif zone.lower() in TZ_NAMES:
+        offset = timedelta(hours=TZ_NAMES[zone.lower()])
+    else:
+        return None
+
+    date_obj = datetime(year, month, int(day), int(hour), int(minute), int(second or 0), tzinfo=timezone(offset))
+    return date_obj.astimezone(timezone.utc)
+
+
+@lru_cache(maxsize=8192)
+def parse_feed_date(date_str):
+    """
+    Convert a feed date string to a timezone-aware UTC datetime. Dates without timezone are taken as UTC.
+
+    Args:
+        date_str (str): The date string in a recognized format.
+
+    Returns:
+        datetime: Timezone-aware datetime in UTC.
+
+    Raises:
+        ValueError: If the date string can't be parsed.
+    """
+    try:
+        date_obj = _parse_rfc822(date_str)
+    except ValueError:
+        date_obj = None
+
+    if date_obj is not None:
+        return date_obj
+
+    try:
+        date_obj = parser.parse(date_str)
+    except (ValueError, OverflowError) as e:
+        raise ValueError(f"Invalid date format: {str(e)}.")
+
+    if date_obj.tzinfo is None:
+        date_obj = date_obj.replace(tzinfo=timezone.utc)
+
+    return date_obj.astimezone(timezone.utc)
+
+
+def benchmark_parse_feed_date(rounds=20000):
+    """
+    Compare `parse_feed_date` with the former `dateutil.parser.parse(...).isoformat()` conversion.
+    """
+    sample_dates = [
+        'Wed, 04 Oct 2023 20:00:00 GMT',
+        'Sat, 30 Sep 2023 02:33:34 -0400',
+        'Mon, 02 Oct 2023 09:15:00 +0100',
+        'Tue, 03 Oct 2023 14:45:10 EDT',
+    ]
+    # Feeds repeat timestamps, here every timestamp shows up in 5 entries
+    zones = ['GMT', '-0400', '+0100', 'EDT']
+    base_date = datetime(2023, 10, 4, 20, 0, 0)
+    date_list = [(base_date + timedelta(seconds=idx // 5)).strftime('%a, %d %b %Y %H:%M:%S ') + zones[idx // 5 % 4]
+                 for idx in range(rounds)]
+
+    def convert_date_string_to_iso(date_str):
+        return parser.parse(date_str).isoformat()
+
+    start = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # dateutil warns on 'EDT' and returns a naive datetime
+        for date_str in date_list:
+            convert_date_string_to_iso(date_str)
+    dateutil_time = time.perf_counter() - start
+
+    parse_feed_date.cache_clear()
+    start = time.perf_counter()
+    for date_str in date_list:
+        _parse_rfc822(date_str)
+    fast_path_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for date_str in date_list:
+        parse_feed_date(date_str)
+    cached_time = time.perf_counter() - start
+
+    for date_str in sample_dates:
+        assert parse_feed_date(date_str) == parser.parse(date_str, tzinfos={'EDT': -4 * 3600})
+
+    print(f"INFO  - Parsed {rounds} dates",
+          f"INFO  - dateutil:           {dateutil_time / rounds * 1e6:6.2f} us/date",
+          f"INFO  - RFC-822 fast path:  {fast_path_time / rounds * 1e6:6.2f} us/date",
+          f"INFO  - parse_feed_date:    {cached_time / rounds * 1e6:6.2f} us/date ({parse_feed_date.cache_info()})",
+          sep='\n')
+
+
+if __name__ == "__main__":
+
+    benchmark_parse_feed_date()
@@ -0,0 +1,192 @@
+"""
+Near-duplicate detection for syndicated stories.
+Titles (or cleaned contents) are fingerprinted with a 64-bit SimHash and bucketed with LSH bands, so only stories
+sharing a band are compared. Candidates within the Hamming distance must also share most of their words and, for
+titles, the same names and numbers, since short headlines about different companies differ in few SimHash bits.
+Each cluster keeps one representative for the expensive downstream stages (browser scraping, OpenAI scoring and
+summaries), preferably from a domain those stages process. Members get `duplicate_of` and inherit the
+representative's results.
+v.2026-10-18
+"""
+import hashlib
+import re
+from collections import defaultdict
+
+SIMHASH_BITS = 64
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+WORD_PATTERN = re.compile(r'[A-Za-z0-9]+')
+# Publishers of trailing ' - Publisher' / ' | Publisher' title suffixes, besides the "publisher" of the entry
+KNOWN_PUBLISHERS = (
+    "The Wall Street Journal", "WSJ", "Financial Times", "FT", "Reuters", "Bloomberg", "Bloomberg.com", "CNBC",
+    "Yahoo Finance", "MarketWatch", "Barron's", "Forbes", "The New York Times", "Business Insider", "Fortune",
+    "Associated Press", "AP News", "BBC", "BBC News", "CNN", "Axios", "Politico", "The Economist",
+)
+
+
+def _token_hash(token):
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), 'little')
+
+
+def publisher_suffix_pattern(publishers):
+    names = "|".join(re.escape(name) for name in sorted(set(publishers), key=len, reverse=True))
+    return re.compile(rf'\s+[-|]\s+(?:{names})\s*$', re.IGNORECASE)
+
+
+KNOWN_PUBLISHERS_PATTERN = publisher_suffix_pattern(KNOWN_PUBLISHERS)
+
+
+def normalize_title(title, publisher=None):
+    """
+    Strip the trailing publisher name of a title. Other text after ' - ' is part of the headline.
+
+    Args:
+    - title (str): Entry title.
+    - publisher (str): Source title of the entry, like the `<source>` of Google News items.
+    """
+    # Case is kept for `key_terms`, the fingerprints are computed on lowercase tokens
+    title = title or ''
+    if publisher:
+        title = publisher_suffix_pattern([publisher]).sub('', title)
+    return KNOWN_PUBLISHERS_PATTERN.sub('', title)
+
+
+def token_jaccard(text_a, text_b):
+    tokens_a, tokens_b = set(TOKEN_PATTERN.findall(text_a.lower())), set(TOKEN_PATTERN.findall(text_b.lower()))
+    return len(tokens_a & tokens_b) / len(tokens_a | tokens_b) if tokens_a | tokens_b else 1.0
+
+
+def key_terms(text):
+    """
+    Returns:
+    - set: Lowercase capitalized words, except the first one, and numbers of a text, like company names and amounts.
+    """
+    words = WORD_PATTERN.findall(text)
+    return {word.lower() for idx, word in enumerate(words) if word[0].isdigit() or (idx > 0 and word[0].isupper())}
+
+
+def texts_match(text_a, text_b, min_jaccard=0.8, match_key_terms=True):
+    """
+    Second check of a SimHash candidate pair.
+
+    Args:
+    - text_a, text_b (str): Compared texts.
+    - min_jaccard (float): Minimum share of common words.
+    - match_key_terms (bool): Also require the same names and numbers. Meant for titles.
+
+    Returns:
+    - bool: True when the texts are the same story.
+    """
+    if token_jaccard(text_a, text_b) < min_jaccard:
+        return False
+    return not match_key_terms or key_terms(text_a) == key_terms(text_b)
+
+
+def simhash(text, shingle_size=1):
+    """
+    Compute the 64-bit SimHash of a text from its word shingles.
+
+    Args:
+    - text (str): Text to fingerprint.
+    - shingle_size (int): Number of consecutive words per feature. Use 1 for titles and 3 or more for contents.
+
+    Returns:
+    - int: Fingerprint. Similar texts have fingerprints with a small Hamming distance.
+    """
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    features = [' '.join(tokens[idx:idx + shingle_size]) for idx in range(max(len(tokens) - shingle_size + 1, 1))]
+
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        feature_hash = _token_hash(feature)
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if feature_hash >> bit & 1 else -1
+
+    return sum(1 << bit for bit in range(SIMHASH_BITS) if weights[bit] > 0)
+
+
+def hamming_distance(hash_a, hash_b):
+    return bin(hash_a ^ hash_b).count('1')
+
+
+def cluster_near_duplicates(news_obj_list, text_func=None, max_distance=3, shingle_size=1, min_jaccard=0.8,
+                            match_key_terms=True, preferred_domains=()):
+    """
+    Group near-duplicate entries and mark all but one per group as duplicates. Entries are updated in place:
+    every entry gets a "cluster_id" (the representative `_id`) and members also get "duplicate_of".
+
+    Args:
+    - news_obj_list (list): Entries with an "_id" key. The first entry of each cluster on the first of
+      `preferred_domains` is its representative, or else its first entry.
+    - text_func (callable): Returns the text to compare for an entry. Defaults to the title without publisher.
+    - max_distance (int): Maximum Hamming distance between fingerprints of near-duplicates.
+    - shingle_size (int): Number of consecutive words per SimHash feature.
+    - min_jaccard (float): Minimum share of common words of near-duplicates.
+    - match_key_terms (bool): Near-duplicates must have the same names and numbers. Meant for titles.
+    - preferred_domains (tuple): Domains processed by the later stages, like the ones scraped by stage 2, in order of
+      preference for representatives. A member on another domain would never get results to inherit.
+
+    Returns:
+    - tuple: `(representatives, members)` lists.
+    """
+    text_func = text_func or (lambda item: normalize_title(item.get("title", ""), item.get("publisher")))
+    texts = [text_func(item) for item in news_obj_list]
+    fingerprints = [simhash(text, shingle_size) for text in texts]
+
+    def same_story(idx_a, idx_b):
+        if hamming_distance(fingerprints[idx_a], fingerprints[idx_b]) > max_distance:
+            return False
+        return texts_match(texts[idx_a], texts[idx_b], min_jaccard, match_key_terms)
+
+    # Pigeonhole: fingerprints within `max_distance` bits share at least one of `max_distance + 1` bands
+    band_count = max_distance + 1
+    band_width = SIMHASH_BITS // band_count
+    buckets = defaultdict(list)
+    for idx, fingerprint in enumerate(fingerprints):
+        for band in range(band_count):
+            band_value = fingerprint >> (band * band_width) & ((1 << band_width) - 1)
+            buckets[(band, band_value)].append(idx)
+
+    parents = list(range(len(news_obj_list)))
+
+    def find(idx):
+        while parents[idx] != idx:
+            parents[idx] = parents[parents[idx]]
+            idx = parents[idx]
+        return idx
+
+    for bucket in buckets.values():
+        for pos, idx_a in enumerate(bucket):
+            for idx_b in bucket[pos + 1:]:
+                root_a, root_b = find(idx_a), find(idx_b)
+                # Representatives are compared too, so clusters don't chain different stories together
+                if root_a != root_b and same_story(idx_a, idx_b) and same_story(root_a, root_b):
+                    parents[max(root_a, root_b)] = min(root_a, root_b)  # Keep the first entry as root
+
+    # Representatives by root, on the most preferred domain of the cluster
+    domain_ranks = {domain: rank for rank, domain in enumerate(preferred_domains)}
+
+    def rank_of(idx):
+        return domain_ranks.get(news_obj_list[idx].get("domain"), len(domain_ranks))
+
+    representative_idx = {}
+    for idx in range(len(news_obj_list)):
+        root = find(idx)
+        if rank_of(idx) < rank_of(representative_idx.get(root, root)):
+            representative_idx[root] = idx
+
+    representatives, members = [], []
+    for idx, item in enumerate(news_obj_list):
+        root = find(idx)
+        representative = news_obj_list[representative_idx.get(root, root)]
+        item.pop("duplicate_of", None)
+        item["cluster_id"] = representative["_id"]
+
+        if representative is item:
+            representatives.append(item)
+        else:
+            item["duplicate_of"] = representative["_id"]
+            members.append(item)
+
+    print(f"INFO  - Found {len(representatives)} unique stories and {len(members)} near-duplicates "
+          f"in {len(news_obj_list)} entries")
+    return representatives, members
@@ -7,122 +7,144 @@ import os
 import pendulum
 from bson.regex import Regex
 from datetime import datetime, date
+from itertools import islice
 from dotenv import load_dotenv
-from pymongo.errors import PyMongoError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
 from pymongo.mongo_client import MongoClient
 
+DUPLICATE_KEY_ERROR = 11000
+
+
+def parse_publish_date(document):
+    """
+    Convert the 'publish_date' string of a document to a Python datetime object, in place.
+
+    Returns:
+    - dict: The same document.
+    """
+    if 'publish_date' in document and not isinstance(document['publish_date'], datetime):
+        document['publish_date'] = pendulum.parse(document['publish_date'])
+    return document
+
+
+def batched(iterable, size):
+    """
+    Yield lists of up to `size` items, without building the whole list of a generator.
+    """
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
 
 class MongoCnx():
 
-    def __init__(self, database="news_db"):
+    def __init__(self, database="news_db", uri=None):
 
         load_dotenv()
         username = os.getenv('MONGODB_USER')
         password = os.getenv('MONGODB_PASSWORD')
-        hostname = "10.109.222.5"
+        hostname = os.getenv('MONGODB_HOST', "10.109.222.5")
         # port = "27017"
         self.database_name = database
 
-        uri = f"mongodb://{username}:{password}@{hostname}/{database}"
+        # A full connection string, like "mongodb://localhost:27017", replaces the credentials and host above
+        uri = uri or os.getenv('MONGODB_URI') or f"mongodb://{username}:{password}@{hostname}/{database}"
 
         self.client = MongoClient(uri)
         self.db = self.client[database]  # Get the database here
 
-    def insert_documents(self, collection_name, document_list):
+    def insert_documents(self, collection_name, document_list, batch_size=1000):
         """
         Insert new documents into MongoDB collection. Do not update existing documents.
+        Documents are sent with unordered `insert_many` batches, and duplicate key errors count as existing documents.
 
         Args:
         - collection_name (str): The MongoDB collection name.
-        - document_list (list): List of dict objects to be inserted as new documents in the collection.
+        - document_list (iterable): List or generator of dict objects to be inserted as new documents in the collection.
+        - batch_size (int): Documents per `insert_many` call.
 
         Returns:
-        - None.
+        - tuple: Inserted and duplicate document counts.
         """
         try:
             # Access the collection in MongoDB
             collection = self.db[collection_name]
-            new_document_list = document_list[:]
 
             inserted_doc_count = 0
             duplicate_doc_count = 0
 
-            for document in new_document_list:
-
-                # Check if the document with the same _id already exists
-                existing_document = collection.find_one({"_id": document["_id"]})
-
-                if existing_document is None:
-                    # Document with the same _id doesn't exist, insert the new document
-                    if 'publish_date' in document and not isinstance(document['publish_date'], datetime):
-                        # Convert the 'publish_date' string to a Python datetime object
-                        parsed_date = pendulum.parse(document['publish_date'])
-                        document['publish_date'] = parsed_date
-
+            for batch in batched(document_list, batch_size):
+                for document in batch:
+                    parse_publish_date(document)
                     document['last_modified'] = datetime.now()
 
-                    collection.insert_one(document)
-                    inserted_doc_count += 1
-                else:
-                    duplicate_doc_count += 1
+                try:
+                    inserted_doc_count += len(collection.insert_many(batch, ordered=False).inserted_ids)
+                except BulkWriteError as e:
+                    # Documents with an existing _id are rejected one by one, the others are still inserted
+                    write_errors = e.details.get("writeErrors", [])
+                    other_errors = [error for error in write_errors if error.get("code") != DUPLICATE_KEY_ERROR]
+                    if other_errors or e.details.get("writeConcernErrors"):
+                        raise
+                    inserted_doc_count += e.details.get("nInserted", 0)
+                    duplicate_doc_count += len(write_errors)
 
             print(
                 f"INFO  - Found {duplicate_doc_count} duplicates, inserted {inserted_doc_count} new documents \
 into '{self.db.name}' collection '{collection.name}'")
-            return None
+            return inserted_doc_count, duplicate_doc_count
 
         except PyMongoError as e:
             print("ERROR - Failure querying MongoDB: ", e)
             raise PyMongoError
 
-    def update_collection(self, collection_name, document_list):
+    def update_collection(self, collection_name, document_list, batch_size=1000):
         """
         Upsert documents into Mongodb collection. Overwrite existing documents with same `id`
+        Updates are sent with unordered `bulk_write` batches.
 
         Args:
         - collection_name (str): The Mongodb collection name.
-        - document_list (list): List of dict objects to be updated as documents on collection
+        - document_list (iterable): List or generator of dict objects to be updated as documents on collection
+        - batch_size (int): Updates per `bulk_write` call.
 
         Returns:
-        - None.
+        - tuple: Upserted, matched and modified document counts.
         """
         try:
             # Access the collection in MongoDB
             collection = self.db[collection_name]
-            new_document_list = document_list[:]
-
-            new_documents_count = 0
-            updated_documents_count = 0
-
-            for document in new_document_list:
-                filter_condition = {"_id": document["_id"]}
-                if 'publish_date' in document and not isinstance(document['publish_date'], datetime):
-                    # Convert the 'publish_date' string to a Python datetime object
-                    parsed_date = pendulum.parse(document['publish_date'])
-                    document['publish_date'] = parsed_date
-
-                update_data = {
-                    "$set": document,
-                    "$currentDate": {'last_modified': {"$type": 'date'}}
-                }
-                update_result = collection.update_one(filter_condition, update_data, upsert=True)
 
-                # Check if the document was updated or inserted
-                if update_result.matched_count > 0:
-                    updated_documents_count += 1
-                else:
-                    new_documents_count += 1
+            upserted_count = 0
+            matched_count = 0
+            modified_count = 0
+
+            for batch in batched(document_list, batch_size):
+                operations = [
+                    UpdateOne({"_id": document["_id"]},
+                              {"$set": {key: value for key, value in parse_publish_date(document).items()
+                                        if key != "_id"},
+                               "$currentDate": {'last_modified': {"$type": 'date'}}},
+                              upsert=True)
+                    for document in batch
+                ]
+                bulk_result = collection.bulk_write(operations, ordered=False)
+                upserted_count += bulk_result.upserted_count
+                matched_count += bulk_result.matched_count
+                modified_count += bulk_result.modified_count
 
             print(
-                f"INFO  - Inserted {new_documents_count}, updated {updated_documents_count} documents \
+                f"INFO  - Inserted {upserted_count}, updated {matched_count} ({modified_count} modified) documents \
 into '{self.db.name}' collection '{collection.name}'")
-            return None
+            return upserted_count, matched_count, modified_count
 
         except PyMongoError as e:
             print("ERROR - Failure querying MongoDB: ", e)
             raise PyMongoError
 
-    def get_doc_list(self, collection_name, domain=None, start_publish_date=None, status=None):
+    def get_doc_list(self, collection_name, domain=None, start_publish_date=None, status=None,
+                     include_duplicates=False, include_ineligible=False):
         """
         Retrieve document list from given domain and publish date.
 
@@ -131,6 +153,8 @@ into '{self.db.name}' collection '{collection.name}'")
             domain (str): The domain to filter articles by.
             start_datetime (datetime object): The minimum publish date as datetime object or string in ISO-8601 format.
             status (str): Document status like 'fetched', 'content_parsed', 'summarized', 'matched', 'email_sent'.
+            include_duplicates (bool): Also return near-duplicates marked with `duplicate_of`.
+            include_ineligible (bool): Also return failed articles still waiting for `failure.next_eligible`.
 
         Returns:
             list: A list of matching articles as dictionaries.
@@ -149,12 +173,21 @@ into '{self.db.name}' collection '{collection.name}'")
             if status is not None:
                 query["status"] = status
 
+            if not include_duplicates:
+                query["duplicate_of"] = {"$exists": False}
+
+            if not include_ineligible:
+                # Articles that "gave_up" are already left out by their status
+                query["$or"] = [{"failure.next_eligible": {"$exists": False}},
+                                {"failure.next_eligible": {"$lte": datetime.utcnow()}}]
+
             projection = {
                 "_id": 1,
                 "publish_date": 1,
                 "domain": 1,
                 "url": 1,
                 "status": 1,
+                "failure": 1,
             }
             sort_parameter = [("publish_date", 1)]
 
@@ -172,7 +205,38 @@ into '{self.db.name}' collection '{collection.name}'")
             print("ERROR - Failure querying MongoDB: ", e)
             raise PyMongoError
 
-    def get_doc_content(self, collection_name, domain=None, min_score=None, start_publish_date=None, status=None):
+    def get_known_keys(self, collection_name, start_publish_date=None):
+        """
+        Retrieve `_id` and `url` of documents already stored on a collection, to skip them before any processing.
+
+        Args:
+            collection_name (str): The name of the collection to query.
+            start_publish_date (datetime object): The minimum publish date as datetime object or string in ISO-8601.
+
+        Returns:
+            generator: `_id` and `url` values of matching documents.
+        """
+        try:
+            query = {}
+            if start_publish_date is not None:
+                parsed_date = start_publish_date if isinstance(
+                    start_publish_date, (date, datetime)) else pendulum.parse(start_publish_date)
+                query["publish_date"] = {"$gte": parsed_date}
+
+            collection = self.db[collection_name]
+            query_result = collection.find(query, {"_id": 1, "url": 1}).batch_size(10000)
+
+            for document in query_result:
+                yield document["_id"]
+                if document.get("url"):
+                    yield document["url"]
+
+        except PyMongoError as e:
+            print("ERROR - Failure querying MongoDB: ", e)
+            raise PyMongoError
+
+    def get_doc_content(self, collection_name, domain=None, min_score=None, start_publish_date=None, status=None,
+                        include_duplicates=False):
         """
         Retrieve document content from given domain and publish date.
 
@@ -181,6 +245,7 @@ into '{self.db.name}' collection '{collection.name}'")
             domain (str): The domain to filter articles by.
             start_datetime (datetime object): The minimum publish date as datetime object or string in ISO-8601 format.
             status (str): Document status like 'fetched', 'content_parsed', 'summarized', 'matched', 'email_sent'.
+            include_duplicates (bool): Also return near-duplicates marked with `duplicate_of`.
 
         Returns:
             list: A list of matching articles as dictionaries.
@@ -202,10 +267,14 @@ into '{self.db.name}' collection '{collection.name}'")
             if status is not None:
                 query["status"] = status
 
+            if not include_duplicates:
+                query["duplicate_of"] = {"$exists": False}
+
             projection = {
                 "_id": 1,
                 "publish_date": 1,
                 "title": 1,
+                "domain": 1,
                 "content": 1,
                 "score": 1,
                 "status": 1
@@ -226,7 +295,8 @@ into '{self.db.name}' collection '{collection.name}'")
             print("ERROR - Failure querying MongoDB: ", e)
             raise PyMongoError
 
-    def get_doc_summary(self, collection_name, domain=None, min_score=None, start_publish_date=None, status=None):
+    def get_doc_summary(self, collection_name, domain=None, min_score=None, start_publish_date=None, status=None,
+                        include_duplicates=False):
         """
         Retrieve document summaries from given domain and publish date.
 
@@ -235,6 +305,7 @@ into '{self.db.name}' collection '{collection.name}'")
             domain (str): The domain to filter articles by.
             start_datetime (datetime object): The minimum publish date as datetime object or string in ISO-8601 format.
             status (str): Document status like 'fetched', 'content_parsed', 'summarized', 'matched', 'email_sent'.
+            include_duplicates (bool): Also return near-duplicates marked with `duplicate_of`.
 
         Returns:
             list: A list of matching articles as dictionaries.
@@ -256,6 +327,9 @@ into '{self.db.name}' collection '{collection.name}'")
             if status is not None:
                 query["status"] = status
 
+            if not include_duplicates:
+                query["duplicate_of"] = {"$exists": False}
+
             projection = {
                 "_id": 1,
                 "publish_date": 1,
@@ -281,6 +355,42 @@ into '{self.db.name}' collection '{collection.name}'")
             print("ERROR - Failure querying MongoDB: ", e)
             raise PyMongoError
 
+    def inherit_cluster_results(self, collection_name, fields):
+        """
+        Copy results of cluster representatives to their near-duplicates (documents with `duplicate_of`).
+
+        Args:
+            collection_name (str): The name of the collection to update.
+            fields (list): Fields to copy, like ["content", "status"]. Members that already have the first field
+                are skipped.
+
+        Returns:
+            None.
+        """
+        try:
+            collection = self.db[collection_name]
+            query = {"duplicate_of": {"$exists": True}, fields[0]: {"$exists": False}}
+            members = list(collection.find(query, {"_id": 1, "duplicate_of": 1}))
+
+            representative_ids = list({member["duplicate_of"] for member in members})
+            query = {"_id": {"$in": representative_ids}, fields[0]: {"$exists": True}}
+            representatives = {document["_id"]: document for document in collection.find(query, fields)}
+
+            document_list = [
+                {"_id": member["_id"], **{field: value for field, value in representatives[
+                    member["duplicate_of"]].items() if field != "_id"}}
+                for member in members if member["duplicate_of"] in representatives
+            ]
+            print(f"INFO  - {len(document_list)}/{len(members)} near-duplicates inherit {fields} from representatives")
+
+            if document_list:
+                self.update_collection(collection_name, document_list)
+            return None
+
+        except PyMongoError as e:
+            print("ERROR - Failure querying MongoDB: ", e)
+            raise PyMongoError
+
     def match_doc_with_keywords(self, collection_name, start_publish_date=None, status="summarized", keyword_list=None):
 
         if keyword_list is None:
@@ -7,10 +7,19 @@ and `.fecht_element` for further processing.
 v.2023-09-05
 '''
 import os
+import queue
+import random
+import shutil
+import sys
+import tempfile
+import threading
 import time
 import zipfile
 import requests
 
+from collections import defaultdict
+from urllib.parse import urlparse
+
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from fake_useragent import UserAgent
@@ -31,7 +40,8 @@ class CustomRequests:
         proxy_url = f'http://{username}:{password}@{endpoint}:{port}'
 
         self.session = requests.Session()
-        self.session.proxies = {'http': proxy_url, 'https': proxy_url}
+        if endpoint:
+            self.session.proxies = {'http': proxy_url, 'https': proxy_url}
         # self.session.auth = proxy_auth
 
         ua = UserAgent(
@@ -58,10 +68,29 @@ class CustomRequests:
             print('INFO  - Failed to get response: ', e)
             raise Exception(f'HTTP Error: {e}')
 
-    def fetch_soup(self, url):
+    def import_browser_session(self, driver):
+        """
+        Copy cookies and headers of a logged-in Selenium driver into this session, to fetch pages over plain HTTP.
+
+        Args:
+        - driver (object) Selenium Chrome webdriver object.
+        """
+        cookies = driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']  # All domains, not only current
+        for cookie in cookies:
+            self.session.cookies.set(cookie['name'], cookie['value'], domain=cookie['domain'],
+                                     path=cookie.get('path', '/'), secure=cookie.get('secure', False))
+
+        self.session.headers.update({
+            'User-Agent': driver.execute_script('return navigator.userAgent;'),
+            'Accept-Language': driver.execute_script('return navigator.languages.join(",");'),
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        })
+        print(f'INFO  - Imported {len(cookies)} cookies from browser session')
+
+    def fetch_soup(self, url, features='html.parser'):
         try:
             response = self.get_response(url)
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = BeautifulSoup(response.text, features)
             return soup
         except Exception as e:
             print('INFO  - Failed to fetch soup: ', e)
@@ -109,9 +138,189 @@ class CustomRequests:
             raise Exception(f'HTTP Error: {e}')
 
 
+class CustomRequestsPool:
+    """
+    Pool of `CustomRequests` sessions across several proxy endpoints and random User-Agents.
+    Each request is routed to a healthy member for the target host, scored by success rate and latency.
+    Members that keep failing on a host are ejected for a while, so a 403/429 only slows down one member.
+    """
+
+    def __init__(self, proxy_list, sessions_per_proxy=2, eject_after=3, eject_seconds=300):
+        """
+        Args:
+        - proxy_list (list): Tuples `(username, password, endpoint, port)`.
+        - sessions_per_proxy (int): Number of sessions (User-Agents) opened per proxy endpoint.
+        - eject_after (int): Consecutive failures on a host before a member is ejected.
+        - eject_seconds (int): Time a member stays ejected for a host.
+        """
+        self.members = []
+        self.labels = []
+        for username, password, endpoint, port in proxy_list:
+            for idx in range(sessions_per_proxy):
+                try:
+                    self.members.append(CustomRequests(username, password, endpoint, port))
+                    self.labels.append(f'{endpoint}#{idx}')
+                except Exception as e:
+                    print(f'ERROR - Could not open session on proxy {endpoint}: ', e)
+
+        if not self.members:
+            raise Exception('Could not open any proxy session')
+
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {'success_rate': 1.0, 'latency': 1.0, 'failures': 0, 'ejected_until': 0})
+        print(f'INFO  - Opened a pool of {len(self.members)} sessions over {len(proxy_list)} proxy endpoints')
+
+    def _score(self, stats):
+        return stats['success_rate'] / max(stats['latency'], 0.05)
+
+    def _pick_member(self, host, exclude=()):
+        now = time.time()
+        with self._lock:
+            candidates = [idx for idx in range(len(self.members)) if idx not in exclude] or range(len(self.members))
+            stats_list = {idx: self._stats[(idx, host)] for idx in candidates}
+            available = [idx for idx, stats in stats_list.items() if stats['ejected_until'] <= now]
+
+            if not available:
+                # Every member is ejected for this host, use the one released first
+                return min(candidates, key=lambda idx: stats_list[idx]['ejected_until'])
+
+            # Weighted choice spreads the load while favoring the healthiest members
+            weights = [self._score(stats_list[idx]) for idx in available]
+            return random.choices(available, weights=weights)[0]
+
+    def _record(self, idx, host, success, latency, alpha=0.3):
+        with self._lock:
+            stats = self._stats[(idx, host)]
+            stats['success_rate'] = (1 - alpha) * stats['success_rate'] + alpha * (1.0 if success else 0.0)
+            stats['latency'] = (1 - alpha) * stats['latency'] + alpha * latency
+
+            if success:
+                stats['failures'] = 0
+            else:
+                stats['failures'] += 1
+                if stats['failures'] >= self.eject_after:
+                    stats['ejected_until'] = time.time() + self.eject_seconds
+                    stats['failures'] = 0
+                    print(f"INFO  - Ejected session {self.labels[idx]} from host '{host}' for {self.eject_seconds}s")
+
+    def _request(self, idx, host, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.members[idx].session.get(url, timeout=5, **kwargs)
+        except Exception as e:
+            self._record(idx, host, False, time.perf_counter() - start)
+            print(f'INFO  - Session {self.labels[idx]} failed to get response: ', e)
+            raise Exception(f'HTTP Error: {e}')
+
+        if response.status_code in (403, 429) or response.status_code >= 500:
+            self._record(idx, host, False, time.perf_counter() - start)
+            raise HTTPError(f'{response.status_code} on session {self.labels[idx]}', response=response)
+
+        self._record(idx, host, True, time.perf_counter() - start)
+        return response
+
+    def get_response(self, url, max_attempts=4, **kwargs):
+        """
+        Get a url, retrying at once on members not tried yet for this request. Members are only reused when every
+        one of them failed.
+        """
+        host = urlparse(url).netloc
+        tried = set()
+        for attempt in range(1, max_attempts + 1):
+            idx = self._pick_member(host, exclude=tried)
+            tried.add(idx)
+            try:
+                return self._request(idx, host, url, **kwargs)
+            except Exception as e:
+                if attempt == max_attempts:
+                    print(f"ERROR - {url} failed on {attempt} attempts. Last error: {e}")
+                    raise
+                print(f"INFO  - Attempt {attempt}/{max_attempts} failed with error: {e}. Retrying on another session")
+
+    def fetch_soup(self, url, features='html.parser'):
+        response = self.get_response(url)
+        return BeautifulSoup(response.text, features)
+
+    def get_redirected_url(self, url):
+        cookies = {'CONSENT': 'YES+cb.20220419-08-p0.cs+FX+111'}
+        response = self.get_response(url, cookies=cookies)
+        soup = BeautifulSoup(response.text, 'html.parser')
+        return soup.a['href']
+
+    def report(self):
+        with self._lock:
+            for (idx, host), stats in sorted(self._stats.items()):
+                print(f"INFO  - {self.labels[idx]:<30} {host[0:40]:<40} success {stats['success_rate']:.2f}, "
+                      f"latency {stats['latency']:.2f}s")
+
+
+DEFAULT_USER_DATA_DIR = 'C:/Users/joaom/Projetos/13dnews/webdriver_data'
+
+# Resources blocked by the 'lean' profile: images, media, fonts and ad/tracker scripts
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+    '*.mp4', '*.webm', '*.m3u8', '*.mp3',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*doubleclick.net*', '*googlesyndication.com*', '*googletagservices.com*', '*googletagmanager.com*',
+    '*google-analytics.com*', '*amazon-adsystem.com*', '*adnxs.com*', '*pubmatic.com*', '*rubiconproject.com*',
+    '*criteo.com*', '*criteo.net*', '*moatads.com*', '*scorecardresearch.com*', '*quantserve.com*',
+    '*chartbeat.com*', '*chartbeat.net*', '*facebook.net*', '*hotjar.com*', '*optimizely.com*', '*nr-data.net*',
+    '*taboola.com*', '*outbrain.com*',
+]
+
+
+def block_resources(driver, domain=None, allowlists=None):
+    """
+    Block `BLOCKED_URL_PATTERNS` on a driver with CDP, except the patterns allowlisted for `domain`.
+
+    Args:
+    - driver (object): Selenium Chrome webdriver object.
+    - domain (str): Domain about to be loaded, like "ft.com".
+    - allowlists (dict): Patterns still needed by a domain, like {"ft.com": ["*.woff2"]}.
+    """
+    allowed_patterns = set((allowlists or {}).get(domain, []))
+    patterns = [pattern for pattern in BLOCKED_URL_PATTERNS if pattern not in allowed_patterns]
+    if getattr(driver, 'blocked_url_patterns', None) != patterns:  # Skip the CDP calls when unchanged
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        driver.blocked_url_patterns = patterns
+
+
+# Records the time of the last DOM change on `window.__lastMutation`
+SCROLL_OBSERVER_SCRIPT = """
+if (!window.__scrollObserver) {
+    window.__lastMutation = performance.now();
+    window.__scrollObserver = new MutationObserver(() => { window.__lastMutation = performance.now(); });
+    window.__scrollObserver.observe(document.body, {childList: true, subtree: true});
+}
+"""
+SCROLL_STATE_SCRIPT = """
+return {
+    height: document.body.scrollHeight,
+    quiet_ms: performance.now() - window.__lastMutation,
+    end_found: Boolean(arguments[0] && document.querySelector(arguments[0])),
+};
+"""
+
+
 class CustomWebDriver:
 
-    def __init__(self, username=None, password=None, endpoint=None, port=None):
+    def __init__(self, username=None, password=None, endpoint=None, port=None, user_data_dir=None,
+                 profile='default', resource_allowlists=None):
+        """
+        Args:
+        - user_data_dir (str): Chrome profile folder. The 'lean' profile uses a temporary folder when not given.
+        - profile (str): 'default' opens a visible Chrome loading every resource. 'lean' runs headless with the
+          `eager` page load strategy and blocks images, media, fonts and ad/tracker scripts.
+        - resource_allowlists (dict): Blocked URL patterns still needed by a domain on the 'lean' profile.
+        """
+        self.profile = profile
+        self.resource_allowlists = resource_allowlists or {}
+        self.temp_dir = None
+        if user_data_dir is None and profile == 'lean':
+            user_data_dir = self.temp_dir = tempfile.mkdtemp(prefix='webdriver_')
 
         self.options = ChromeOptions()
         self.options.use_chromium = True  # Use Chromium-based Edge
@@ -127,11 +336,18 @@ class CustomWebDriver:
         # self.options.add_argument('--disable-gpu')
         # self.options.add_argument('--disable-javascript')  # EXPERIMENTAL
         # self.options.add_argument('--incognito')
-        user_data_dir = 'C:/Users/joaom/Projetos/13dnews/webdriver_data'
-
-        self.options.add_argument(f'--user-data-dir={user_data_dir}')
-
-        self.options.add_experimental_option('detach', True)  # DEBUG
+        self.options.add_argument(f'--user-data-dir={user_data_dir or DEFAULT_USER_DATA_DIR}')
+
+        if profile == 'lean':
+            self.options.add_argument('--headless=new')
+            self.options.add_argument('--disable-gpu')
+            self.options.add_argument('--blink-settings=imagesEnabled=false')
+            self.options.add_argument('--mute-audio')
+            self.options.add_argument('--disable-extensions')
+            self.options.add_argument('--no-first-run')
+            self.options.page_load_strategy = 'eager'  # Return on DOMContentLoaded
+        else:
+            self.options.add_experimental_option('detach', True)  # DEBUG
         self.options.add_experimental_option('excludeSwitches', ['enable-automation'])
         self.options.add_experimental_option('excludeSwitches', ['enable-logging'])
         self.options.add_experimental_option('useAutomationExtension', False)
@@ -159,6 +375,8 @@ class CustomWebDriver:
             print('INFO  - Opening a new session')
             self.driver = Chrome(options=self.options)
             self.driver.implicitly_wait(0.5)
+            if self.profile == 'lean':
+                block_resources(self.driver)
             self.driver.set_window_position(2560, 0)
             # self.driver.delete_all_cookies()
             # Change the property value of the  navigator  for webdriver to undefined
@@ -208,7 +426,71 @@ class CustomWebDriver:
         return []
 
     @retry()
-    def infinite_scroll(self, scroll_pause_time=10, end_scroll_attempts=3):
+    def infinite_scroll(self, scroll_pause_time=10, end_scroll_attempts=3, end_selector=None, mode='events'):
+        """
+        Scroll down until no more content loads.
+
+        Args:
+        - scroll_pause_time (int): 'keys' mode only, seconds to wait after each round of PAGE_DOWN.
+        - end_scroll_attempts (int): Rounds without new content before stopping.
+        - end_selector (str): CSS selector of an "end of list" element, stops as soon as it appears.
+        - mode (str): 'events' scrolls and returns when DOM mutations settle, 'keys' presses PAGE_DOWN with sleeps.
+        """
+        if mode == 'keys':
+            return self._infinite_scroll_keys(scroll_pause_time, end_scroll_attempts)
+        return self.scroll_until_settled(end_selector=end_selector, end_scroll_attempts=end_scroll_attempts)
+
+    def scroll_until_settled(self, end_selector=None, end_scroll_attempts=3, settle_seconds=1.5, max_seconds=180):
+        """
+        Scroll to the bottom and poll page height and a MutationObserver timestamp with an adaptive backoff (0.1s
+        doubling up to 1s). A round ends when the height grows (scroll again) or when the DOM has been quiet for
+        `settle_seconds` since the scroll and the last mutation, without growth (count an attempt).
+
+        Returns:
+        - dict: "seconds", "height", "scrolls" and the stop "reason".
+        """
+        start = time.perf_counter()
+        self.driver.execute_script(SCROLL_OBSERVER_SCRIPT)
+        last_height = self.driver.execute_script('return document.body.scrollHeight')
+        print(f'INFO  - Window opened with content height of {last_height}')
+
+        attempts, scrolls, reason = 0, 0, 'settled'
+        while attempts < end_scroll_attempts:
+            # Quiet time counts from the scroll, so each round waits for the XHR it triggers
+            self.driver.execute_script(
+                'window.__lastMutation = performance.now(); window.scrollTo(0, document.body.scrollHeight);')
+            scrolls += 1
+            poll_time = 0.1
+
+            while True:
+                time.sleep(poll_time)
+                state = self.driver.execute_script(SCROLL_STATE_SCRIPT, end_selector)
+                if state['end_found'] or time.perf_counter() - start > max_seconds:
+                    break
+                if state['height'] > last_height or state['quiet_ms'] >= settle_seconds * 1000:
+                    break
+                poll_time = min(poll_time * 2, 1.0)
+
+            if state['end_found']:
+                reason = 'end selector'
+                break
+            if time.perf_counter() - start > max_seconds:
+                reason = 'max time'
+                break
+
+            if state['height'] > last_height:
+                attempts = 0
+                last_height = state['height']
+                print(f'INFO  - Scroll down to height {last_height}')
+            else:
+                attempts += 1
+
+        seconds = time.perf_counter() - start
+        print(f'INFO  - Page scrolled to height {last_height} in {seconds:.1f}s ({scrolls} scrolls, {reason})')
+        return {'seconds': seconds, 'height': last_height, 'scrolls': scrolls, 'reason': reason}
+
+    def _infinite_scroll_keys(self, scroll_pause_time=10, end_scroll_attempts=3):
+        start = time.perf_counter()
         last_height = self.driver.execute_script('return document.body.scrollHeight')
         # footer = self.driver.find_element(By.CSS_SELECTOR, 'div.footerstyles__Footer-sc-1ar2w9j-0.jdgzxt')
         # ActionChains(self.driver).scroll_to_element(footer).perform()
@@ -239,7 +521,24 @@ class CustomWebDriver:
             last_height = new_height
             print(f'INFO  - Scroll down to height {new_height}')
 
-        print('INFO  - Page seems to be fully loaded')
+        seconds = time.perf_counter() - start
+        print(f'INFO  - Page seems to be fully loaded, scrolled for {seconds:.1f}s')
+        return {'seconds': seconds, 'height': last_height, 'scrolls': None, 'reason': 'settled'}
+
+    def quit_driver(self):
+        """
+        Quit the browser and remove the temporary profile, if any.
+        """
+        try:
+            if self.driver is not None:
+                self.driver.quit()
+        finally:
+            self.driver = None
+            if self.temp_dir:
+                shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def block_resources(self, domain=None):
+        block_resources(self.driver, domain, self.resource_allowlists)
 
     @retry()
     def close_driver(self):
@@ -313,6 +612,228 @@ class CustomWebDriver:
         return extension
 
 
+class WebDriverPool:
+    """
+    Pool of browser workers serving items from a shared queue. Each worker opens its own Chrome profile and runs
+    `setup(driver)` once (e.g. login). A worker whose browser dies is restarted and retries its item once, so one
+    dead Chrome does not abort the batch.
+    """
+
+    def __init__(self, size=2, setup=None, max_restarts=3, **driver_kwargs):
+        """
+        Args:
+        - size (int): Number of browser workers.
+        - setup (callable): Called with each new driver, before it serves items.
+        - max_restarts (int): Restarts allowed per worker before it stops serving items.
+        - driver_kwargs: Arguments for `CustomWebDriver`. `user_data_dir` gets a per-worker suffix.
+        """
+        self.size = size
+        self.setup = setup
+        self.max_restarts = max_restarts
+        self.driver_kwargs = driver_kwargs
+        self.handlers = [None] * size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _open_worker(self, worker_idx):
+        kwargs = dict(self.driver_kwargs)
+        if kwargs.get('user_data_dir') or kwargs.get('profile', 'default') != 'lean':  # 'lean' defaults to temp dirs
+            kwargs['user_data_dir'] = f"{kwargs.get('user_data_dir') or DEFAULT_USER_DATA_DIR}_{worker_idx}"
+
+        handler = CustomWebDriver(**kwargs)
+        handler.open_driver()
+        if self.setup is not None:
+            try:
+                self.setup(handler.driver)
+            except Exception:
+                handler.quit_driver()  # Not in `self.handlers` yet, so `close` would not quit it
+                raise
+
+        self.handlers[worker_idx] = handler
+        return handler
+
+    def _close_worker(self, worker_idx):
+        handler = self.handlers[worker_idx]
+        self.handlers[worker_idx] = None
+        if handler is not None and handler.driver is not None:
+            try:
+                handler.quit_driver()
+            except Exception as e:
+                print(f'ERROR - Worker {worker_idx} could not quit driver: ', e)
+
+    @staticmethod
+    def _is_alive(handler):
+        try:
+            handler.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def get_driver(self, worker_idx=0):
+        """
+        Open a worker browser if needed and return its driver, e.g. to export its logged-in session.
+        """
+        handler = self.handlers[worker_idx] or self._open_worker(worker_idx)
+        return handler.driver
+
+    def _worker_loop(self, worker_idx, func, task_queue, result_queue):
+        restarts = 0
+        handler = self.handlers[worker_idx]
+
+        while True:
+            item = task_queue.get()
+            if item is task_queue:  # Sentinel
+                break
+
+            for attempt in range(2):
+                try:
+                    if handler is None:
+                        handler = self._open_worker(worker_idx)
+                    result_queue.put((item, func(handler.driver, item), None))
+                    break
+
+                except Exception as e:
+                    if handler is not None and self._is_alive(handler):
+                        result_queue.put((item, None, e))
+                        break
+
+                    # Browser crashed or could not open, restart it and retry the item once
+                    print(f'ERROR - Worker {worker_idx} browser is down: {e}')
+                    self._close_worker(worker_idx)
+                    handler = None
+                    restarts += 1
+
+                    if restarts > self.max_restarts or attempt == 1:
+                        result_queue.put((item, None, e))
+                        break
+
+            if restarts > self.max_restarts:
+                print(f'ERROR - Worker {worker_idx} exceeded {self.max_restarts} restarts, stopping it')
+                break
+
+        result_queue.put(worker_idx)  # Tell the consumer this worker stopped
+
+    def map_unordered(self, func, items):
+        """
+        Call `func(driver, item)` for every item on the browser workers.
+
+        Args:
+        - func (callable): Function of a driver and an item.
+        - items (iterable): Work items. Items are pulled lazily, so a rate limited generator keeps its timing.
+
+        Returns:
+        - generator: Tuples `(item, result, error)` in completion order.
+        """
+        task_queue = queue.Queue(maxsize=self.size)
+        result_queue = queue.Queue()
+
+        workers = [threading.Thread(target=self._worker_loop, args=(idx, func, task_queue, result_queue), daemon=True)
+                   for idx in range(self.size)]
+        [worker.start() for worker in workers]
+
+        def feed():
+            for item in items:
+                task_queue.put(item)
+            [task_queue.put(task_queue) for _ in workers]
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+
+        running_workers = len(workers)
+        while running_workers:
+            result = result_queue.get()
+            if isinstance(result, int):
+                running_workers -= 1
+                continue
+            yield result
+
+        # Every worker stopped on errors, report the items that were not served
+        while feeder.is_alive() or not task_queue.empty():
+            try:
+                item = task_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is not task_queue:
+                yield item, None, Exception('No browser worker available')
+
+    def close(self):
+        for worker_idx in range(self.size):
+            self._close_worker(worker_idx)
+        print(f'INFO  - Closed pool of {self.size} browser workers')
+
+
+def _process_tree_rss_mb(pid):
+    # Resident memory of a process and its children, read from /proc (Linux only)
+    if not os.path.exists(f'/proc/{pid}'):
+        return None
+
+    total_kb, pids = 0, [pid]
+    while pids:
+        current_pid = pids.pop()
+        try:
+            with open(f'/proc/{current_pid}/status') as status_file:
+                for line in status_file:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+            for task in os.listdir(f'/proc/{current_pid}/task'):
+                with open(f'/proc/{current_pid}/task/{task}/children') as children_file:
+                    pids.extend(int(child) for child in children_file.read().split())
+        except OSError:
+            continue
+    return total_kb / 1024
+
+
+def measure_page_loads(handler, urls):
+    """
+    Load each url and measure seconds until <body> is available, JS heap and browser memory.
+
+    Returns:
+    - list: Dicts with "url", "seconds", "js_heap_mb" and "rss_mb" (None when not on Linux).
+    """
+    handler.driver.execute_cdp_cmd('Performance.enable', {})
+    measurements = []
+    for url in urls:
+        if handler.profile == 'lean':
+            handler.block_resources(urlparse(url).hostname.replace('www.', ''))
+        start = time.perf_counter()
+        handler.driver.get(url)
+        handler.driver.find_element(By.TAG_NAME, 'body')
+        seconds = time.perf_counter() - start
+
+        metrics = {metric['name']: metric['value']
+                   for metric in handler.driver.execute_cdp_cmd('Performance.getMetrics', {})['metrics']}
+        measurements.append({
+            'url': url,
+            'seconds': seconds,
+            'js_heap_mb': metrics.get('JSHeapUsedSize', 0) / 1024 ** 2,
+            'rss_mb': _process_tree_rss_mb(handler.driver.service.process.pid),
+        })
+    return measurements
+
+
+def benchmark_profiles(urls, profiles=('default', 'lean'), **driver_kwargs):
+    """
+    Print mean page time and memory per article for each driver profile.
+    """
+    for profile in profiles:
+        handler = CustomWebDriver(profile=profile, **driver_kwargs)
+        handler.open_driver()
+        try:
+            measurements = measure_page_loads(handler, urls)
+        finally:
+            handler.quit_driver()
+
+        rss_values = [item['rss_mb'] for item in measurements if item['rss_mb'] is not None]
+        rss_text = f"{sum(rss_values) / len(rss_values):.0f} MB" if rss_values else "n/a"
+        print(f"INFO  - Profile '{profile}': {sum(item['seconds'] for item in measurements) / len(urls):.2f}s/page, "
+              f"JS heap {sum(item['js_heap_mb'] for item in measurements) / len(urls):.1f} MB, "
+              f"browser memory {rss_text}")
+
+
 def test_custom_requests(username, password, endpoint, port):
     # url_to_scrape = 'https://www.scrapethissite.com/pages/simple/'
 
@@ -350,6 +871,9 @@ if __name__ == '__main__':
     # proxy_string = f'http://{username}:{password}@{endpoint}:{port}'
     # print(proxy_string)
 
-    test_custom_requests(username, password, endpoint, port)
+    if len(sys.argv) > 1:  # Compare driver profiles on article urls
+        benchmark_profiles(sys.argv[1:])
+    else:
+        test_custom_requests(username, password, endpoint, port)
 
-    test_custom_webdriver(username, password, endpoint, port)
+        test_custom_webdriver(username, password, endpoint, port)
@@ -0,0 +1,145 @@
+"""
+Failure records of articles that could not be extracted, with exponential backoff per failure class.
+A failed article gets {"failure": {"class", "attempts", "next_eligible", "last_error"}} and is skipped by
+`MongoCnx.get_doc_list` until `next_eligible`. After `MAX_ATTEMPTS` failures its status becomes "gave_up".
+Failures caused by the scraper itself (browser crashes, domains the browser could not log in to) are retried after
+the first wait of their class, and don't count towards giving up. Reset articles that gave up with:
+    python -m src._failures reset --collection news_unprocessed --domain wsj.com --class no_article
+v.2026-10-18
+"""
+import argparse
+import re
+from datetime import datetime, timedelta
+
+from requests.exceptions import RequestException
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+MAX_ATTEMPTS = 5
+HTTP_ERROR_PATTERN = re.compile(r'HTTP Error: (\d{3}) ')
+MAX_BACKOFF = timedelta(days=2)
+# Failure classes of the scraper, not of the article
+UNCOUNTED_CLASSES = {"browser"}
+# First wait by failure class, doubled on each new attempt
+BACKOFF_BASE = {
+    "timeout": timedelta(minutes=30),
+    "blocked": timedelta(hours=2),
+    "no_article": timedelta(hours=6),
+    "browser": timedelta(minutes=15),
+    "network": timedelta(minutes=30),
+    "other": timedelta(hours=1),
+}
+
+
+def response_status(error):
+    """
+    Returns:
+    - int: HTTP status code of a response error, like `HTTPError`, or of the "HTTP Error: 403 ..." messages of
+      `CustomRequests`. None for other errors, whose messages may hold ids or urls with the same digits.
+    """
+    response = getattr(error, "response", None)
+    if response is not None:
+        return response.status_code
+    match = HTTP_ERROR_PATTERN.match(str(error))
+    return int(match.group(1)) if match else None
+
+
+def classify_failure(error):
+    message = str(error)
+    if isinstance(error, ValueError) and "article" in message:
+        return "no_article"
+    if isinstance(error, TimeoutException) or "timed out" in message.lower():
+        return "timeout"
+    if response_status(error) in (403, 429):
+        return "blocked"
+    if isinstance(error, WebDriverException):
+        return "browser"
+    if isinstance(error, RequestException):
+        return "network"
+    return "other"
+
+
+def failure_entry(item, error, now=None, max_attempts=MAX_ATTEMPTS, counted=True):
+    """
+    Build the update of a failed article.
+
+    Args:
+    - item (dict): Article document with "_id" and its current "failure", if any.
+    - error (Exception): Extraction error.
+    - now (datetime): Current UTC time.
+    - max_attempts (int): Failures before the article status becomes "gave_up".
+    - counted (bool): False when the failure was caused by the scraper, like a browser without login session.
+
+    Returns:
+    - dict: Entry for `update_collection`.
+    """
+    now = now or datetime.utcnow()
+    failure_class = classify_failure(error)
+    attempts = (item.get("failure") or {}).get("attempts", 0)
+    counted = counted and failure_class not in UNCOUNTED_CLASSES
+    if counted:
+        attempts += 1
+        backoff = min(BACKOFF_BASE[failure_class] * 2 ** (attempts - 1), MAX_BACKOFF)
+    else:
+        backoff = BACKOFF_BASE[failure_class]
+
+    entry = {
+        "_id": item["_id"],
+        "failure": {
+            "class": failure_class,
+            "attempts": attempts,
+            "next_eligible": now + backoff,
+            "last_error": message_head(error),
+        },
+    }
+    if attempts >= max_attempts:
+        entry["status"] = "gave_up"
+        print(f"INFO  - Gave up on {item['_id']} after {attempts} failures ({failure_class})")
+    else:
+        print(f"INFO  - {item['_id']} failed with '{failure_class}' ({attempts}/{max_attempts}"
+              f"{'' if counted else ', not counted'}), "
+              f"next attempt after {entry['failure']['next_eligible']:%Y-%m-%d %H:%M} UTC")
+    return entry
+
+
+def reset_failures(mongo_cnx, collection_name, domains=None, failure_class=None, status="fetched"):
+    """
+    Make articles that gave up eligible again, e.g. after fixing a selector or a login.
+
+    Args:
+    - mongo_cnx (MongoCnx): Database connection.
+    - collection_name (str): Collection with the articles.
+    - domains (list): Only reset these domains.
+    - failure_class (str): Only reset this failure class.
+    - status (str): Status set back on the articles.
+
+    Returns:
+    - int: Articles reset.
+    """
+    query = {"status": "gave_up"}
+    if domains:
+        query["domain"] = {"$in": domains}
+    if failure_class:
+        query["failure.class"] = failure_class
+
+    result = mongo_cnx.db[collection_name].update_many(
+        query, {"$set": {"status": status}, "$unset": {"failure": ""},
+                "$currentDate": {"last_modified": {"$type": "date"}}})
+    print(f"INFO  - Reset {result.modified_count} articles that gave up on '{collection_name}' to '{status}'")
+    return result.modified_count
+
+
+def message_head(error, length=300):
+    return f"{type(error).__name__}: {error}"[:length]
+
+
+if __name__ == "__main__":
+    from src._drv_mongodb import MongoCnx
+
+    parser = argparse.ArgumentParser(description="Article failure records")
+    parser.add_argument("command", choices=["reset"])
+    parser.add_argument("--collection", default="news_unprocessed")
+    parser.add_argument("--domain", action="append", dest="domains", help="Domain to reset, repeatable")
+    parser.add_argument("--class", dest="failure_class", choices=sorted(BACKOFF_BASE))
+    args = parser.parse_args()
+
+    reset_failures(MongoCnx("news_db"), args.collection, domains=args.domains, failure_class=args.failure_class)
@@ -0,0 +1,146 @@
+"""
+Offline decoder for Google News article links (`news.google.com/rss/articles/<token>`).
+Most tokens are a base64url encoded protobuf message that carries the publisher URL in field 4, so it can be read
+without downloading the Google News interstitial page. Newer opaque tokens ('AU_yqL...') are reported as misses and
+must be resolved over HTTP.
+v.2026-10-18
+"""
+import base64
+import binascii
+import time
+from urllib.parse import urlparse
+
+URL_FIELD_NUMBER = 4
+
+# (token, expected publisher url or None when the token can't be decoded offline), see tests/test_gnews_decoder.py
+FIXTURES = [
+    # Short URL, 1-byte length varint
+    ('CBMiSmh0dHBzOi8vd3d3Lndzai5jb20vYXJ0aWNsZXMvYWN0aXZpc3QtaW52ZXN0b3ItdGFrZXMtc3Rha2UtaW4tY29tcGFueS0xMjM0',
+     'https://www.wsj.com/articles/activist-investor-takes-stake-in-company-1234'),
+    # Long URL, 2-byte length varint
+    ('CBMikwFodHRwczovL3d3dy5mdC5jb20vY29udGVudC9hYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFh'
+     'YWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWFhYWE',
+     'https://www.ft.com/content/' + 'a' * 120),
+    # URL followed by the AMP URL in field 26
+    ('CBMiM2h0dHBzOi8vd3d3LnJldXRlcnMuY29tL21hcmtldHMvZGVhbHMveC0yMDIzLTEwLTA0L9IBN2h0dHBzOi8vd3d3LnJldXRlcnMuY29tL21'
+     'hcmtldHMvZGVhbHMveC0yMDIzLTEwLTA0Lz9hbXA',
+     'https://www.reuters.com/markets/deals/x-2023-10-04/'),
+    # Opaque article id, needs the HTTP fallback
+    ('CBMiJ0FVX3lxTE9wYXF1ZUFydGljbGVJZGVudGlmaWVyMDEyMzQ1Njc4OQ', None),
+    # Not a protobuf message
+    ('bm90LWEtdG9rZW4', None),
+]
+
+
+def _read_varint(data, pos):
+    result, shift = 0, 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _iter_protobuf_fields(data):
+    """
+    Yield `(field_number, value)` for the top-level fields of a protobuf message. Raises on malformed data.
+    """
+    pos = 0
+    while pos < len(data):
+        key, pos = _read_varint(data, pos)
+        field_number, wire_type = key >> 3, key & 0x07
+
+        if wire_type == 0:
+            value, pos = _read_varint(data, pos)
+        elif wire_type == 1:
+            value, pos = data[pos:pos + 8], pos + 8
+        elif wire_type == 2:
+            length, pos = _read_varint(data, pos)
+            value, pos = data[pos:pos + length], pos + length
+        elif wire_type == 5:
+            value, pos = data[pos:pos + 4], pos + 4
+        else:
+            raise ValueError(f'Unsupported wire type {wire_type}')
+
+        if pos > len(data):
+            raise ValueError('Truncated message')
+        yield field_number, value
+
+
+def decode_google_news_token(token):
+    """
+    Extract the publisher URL from a Google News article token.
+
+    Args:
+    - token (str): Last path segment of a `news.google.com/rss/articles/` link.
+
+    Returns:
+    - str: The publisher URL, or None if the token does not carry it.
+    """
+    try:
+        data = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        for field_number, value in _iter_protobuf_fields(data):
+            if field_number == URL_FIELD_NUMBER and isinstance(value, bytes):
+                url = value.decode('utf-8')
+                return url if url.startswith(('http://', 'https://')) else None
+    except (binascii.Error, ValueError, IndexError, UnicodeDecodeError):
+        return None
+
+    return None
+
+
+class GoogleNewsDecoder:
+    """
+    Decode Google News article links offline and count hits and misses.
+    """
+
+    def __init__(self):
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def decode(self, url):
+        """
+        Args:
+        - url (str): Google News article link.
+
+        Returns:
+        - str: The publisher URL, or None when the link must be resolved over HTTP.
+        """
+        parsed_url = urlparse(url)
+        path_parts = parsed_url.path.rstrip('/').split('/')
+
+        final_url = None
+        if parsed_url.netloc == 'news.google.com' and 'articles' in path_parts[:-1]:
+            final_url = decode_google_news_token(path_parts[-1])
+
+        if final_url:
+            self.hit_count += 1
+        else:
+            self.miss_count += 1
+        return final_url
+
+
+def benchmark_decoder(rounds=20000):
+    url_list = [f'https://news.google.com/rss/articles/{token}?oc=5' for token, _ in FIXTURES]
+    decoder = GoogleNewsDecoder()
+
+    for token, _ in FIXTURES:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            decode_google_news_token(token)
+        elapsed = time.perf_counter() - start
+        print(f'INFO  - {token[0:30]:<30} {elapsed / rounds * 1e6:7.2f} us/decode')
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for url in url_list:
+            decoder.decode(url)
+    elapsed = time.perf_counter() - start
+    print(f'INFO  - {rounds * len(url_list) / elapsed:,.0f} links/s decoded offline')
+
+
+if __name__ == '__main__':
+
+    benchmark_decoder()
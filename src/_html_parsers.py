@@ -0,0 +1,248 @@
+"""
+HTML parser backends for article extraction, selectable per run with the `HTML_PARSER` environment variable.
+All backends take the same CSS selectors and return the text of the first non-empty match, with a line break at each
+block element (paragraphs, headings, list items...), so boilerplate lines can be told apart from the article text:
+- 'html.parser': BeautifulSoup with the pure-Python parser of the standard library (default, no extra install).
+- 'bs4-lxml': BeautifulSoup with the lxml tree builder.
+- 'lxml': lxml.html with cssselect.
+- 'selectolax': selectolax with the Lexbor engine.
+Benchmark the backends over saved pages with `python -m src._html_parsers [html_archive or folder of .html files]`.
+v.2026-10-18
+"""
+import glob
+import multiprocessing
+import os
+import re
+import sys
+import time
+
+XML_DECLARATION_PATTERN = re.compile(r'^\s*<\?xml[^>]*\?>')
+# Elements whose text starts a new line
+BLOCK_TAGS = ('address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl', 'dt', 'figcaption', 'figure',
+              'footer', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre',
+              'section', 'table', 'tr', 'ul')
+
+
+class BeautifulSoupParser:
+
+    def __init__(self, features='html.parser'):
+        from bs4 import BeautifulSoup
+        from bs4.builder import builder_registry
+        if builder_registry.lookup(features) is None:
+            raise ImportError(f"No BeautifulSoup tree builder for '{features}'")
+        import soupsieve
+        self._soup_class = BeautifulSoup
+        self._compile = soupsieve.compile
+        self._selectors = {}
+        self.features = features
+
+    def parse(self, html):
+        return self._soup_class(html, self.features)
+
+    def select_text(self, document, css_selectors):
+        for css_selector in css_selectors:
+            if css_selector not in self._selectors:
+                self._selectors[css_selector] = self._compile(css_selector)
+            element = self._selectors[css_selector].select_one(document)
+            if element is not None and element.text.strip():
+                for block in element.find_all(BLOCK_TAGS):
+                    block.insert_before("\n")
+                    block.insert_after("\n")
+                return element.get_text()
+        return None
+
+
+class LxmlParser:
+
+    def __init__(self):
+        import lxml.html
+        from lxml.cssselect import CSSSelector
+        from lxml.etree import ParserError
+        self._fromstring = lxml.html.fromstring
+        self._parser_error = ParserError
+        self._selector_class = CSSSelector
+        self._selectors = {}
+
+    def parse(self, html):
+        """
+        Returns:
+        - object: Root element, or None for an empty document.
+        """
+        if isinstance(html, str):
+            html = XML_DECLARATION_PATTERN.sub('', html, count=1)  # lxml refuses str with an encoding declaration
+        try:
+            return self._fromstring(html)
+        except self._parser_error:  # Empty document
+            return None
+
+    def select_text(self, document, css_selectors):
+        if document is None:
+            return None
+        for css_selector in css_selectors:
+            if css_selector not in self._selectors:
+                self._selectors[css_selector] = self._selector_class(css_selector)
+            elements = self._selectors[css_selector](document)
+            if elements and elements[0].text_content().strip():
+                for block in elements[0].iter(*BLOCK_TAGS):
+                    block.text = "\n" + (block.text or "")
+                    block.tail = "\n" + (block.tail or "")
+                return elements[0].text_content()
+        return None
+
+
+class SelectolaxParser:
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser_class = LexborHTMLParser
+
+    def parse(self, html):
+        return self._parser_class(html)
+
+    def select_text(self, document, css_selectors):
+        for css_selector in css_selectors:
+            element = document.css_first(css_selector)
+            if element is not None and element.text().strip():
+                parts = []
+                self._append_text(element, parts)
+                return "".join(parts)
+        return None
+
+    def _append_text(self, node, parts):
+        # Line breaks before and after block elements, like the other backends
+        for child in node.iter(include_text=True):
+            if child.tag == "-text":
+                parts.append(child.text_content or "")
+            elif child.tag in BLOCK_TAGS:
+                parts.append("\n")
+                self._append_text(child, parts)
+                parts.append("\n")
+            else:
+                self._append_text(child, parts)
+
+
+PARSERS = {
+    'html.parser': lambda: BeautifulSoupParser('html.parser'),
+    'bs4-lxml': lambda: BeautifulSoupParser('lxml'),
+    'lxml': LxmlParser,
+    'selectolax': SelectolaxParser,
+}
+
+
+def get_parser(name='html.parser'):
+    """
+    Args:
+    - name (str): Backend name, one of `PARSERS`.
+
+    Returns:
+    - object: Parser with `.parse(html)` and `.select_text(document, css_selectors)`.
+    """
+    if name not in PARSERS:
+        raise ValueError(f"Unknown HTML parser '{name}', use one of {list(PARSERS)}")
+
+    try:
+        return PARSERS[name]()
+    except ImportError as e:
+        raise ImportError(f"HTML parser '{name}' is not installed: {e}") from e
+
+
+def _peak_memory_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024  # Bytes on macOS, KB on Linux
+
+
+def _iter_pages(source_path, keys):
+    if os.path.exists(os.path.join(source_path, 'index.sqlite')):
+        from src._archive import HtmlArchive
+        archive = HtmlArchive(source_path)
+        for key in keys:
+            yield archive.get(key)
+        archive.close()
+    else:
+        for key in keys:
+            with open(os.path.join(source_path, key), 'r', encoding='utf-8') as html_file:
+                yield html_file.read()
+
+
+def _benchmark_backend(name, source_path, keys, css_selectors, result_queue):
+    # Runs in its own process, so peak memory is not shared between backends
+    try:
+        result_queue.put(_run_backend(name, get_parser(name), source_path, keys, css_selectors))
+    except Exception as e:  # Also reported on the parent, which waits for a result
+        result_queue.put({"name": name, "error": str(e)})
+
+
+def _run_backend(name, parser, source_path, keys, css_selectors):
+    baseline_memory = _peak_memory_mb()
+    page_count, found_count, total_bytes, elapsed = 0, 0, 0, 0
+    for html in _iter_pages(source_path, keys):
+        total_bytes += len(html)
+        start = time.perf_counter()  # Reads are not timed
+        if parser.select_text(parser.parse(html), css_selectors):
+            found_count += 1
+        elapsed += time.perf_counter() - start
+        page_count += 1
+
+    peak_memory = _peak_memory_mb()
+    return {
+        "name": name,
+        "pages_per_second": page_count / elapsed if elapsed else 0,
+        "megabytes_per_second": total_bytes / 1024 ** 2 / elapsed if elapsed else 0,
+        "found_count": found_count,
+        "page_count": page_count,
+        "peak_memory_mb": peak_memory - baseline_memory if peak_memory is not None else None,
+    }
+
+
+def benchmark_parsers(source_path='./html_archive', css_selectors=('article', '#article-body', 'section'),
+                      names=None, limit=None):
+    """
+    Parse the saved pages with each backend and print pages/s, MB/s, pages with article body and peak memory.
+
+    Args:
+    - source_path (str): `HtmlArchive` folder, or folder of .html files.
+    - css_selectors (tuple): Article selectors, tried in order.
+    - names (list): Backends to compare. Defaults to all of `PARSERS`.
+    - limit (int): Maximum number of pages.
+    """
+    if os.path.exists(os.path.join(source_path, 'index.sqlite')):
+        from src._archive import HtmlArchive
+        archive = HtmlArchive(source_path)
+        keys = sorted(archive.ids())[:limit]
+        archive.close()
+    else:
+        keys = sorted(os.path.basename(path) for path in glob.glob(os.path.join(source_path, '*.html')))[:limit]
+
+    if not keys:
+        print(f"INFO  - No saved pages found on '{source_path}'")
+        return []
+
+    print(f"INFO  - Benchmarking HTML parsers over {len(keys)} pages from '{source_path}'")
+    results = []
+    for name in names or PARSERS:
+        result_queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=_benchmark_backend,
+                                          args=(name, source_path, keys, list(css_selectors), result_queue))
+        process.start()
+        result = result_queue.get()
+        process.join()
+        results.append(result)
+
+        if "error" in result:
+            print(f"INFO  - {name:<12} skipped: {result['error']}")
+            continue
+
+        peak_memory = f"{result['peak_memory_mb']:.1f} MB" if result['peak_memory_mb'] is not None else "n/a"
+        print(f"INFO  - {name:<12} {result['pages_per_second']:8.1f} pages/s "
+              f"{result['megabytes_per_second']:7.2f} MB/s, article found {result['found_count']}/"
+              f"{result['page_count']}, peak memory +{peak_memory}")
+
+    return results
+
+
+if __name__ == '__main__':
+    benchmark_parsers(*sys.argv[1:2])
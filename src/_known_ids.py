@@ -0,0 +1,92 @@
+"""
+In-memory index of articles already ingested (`_id` and canonical url), used to drop known entries right after
+feed parsing, before redirect resolution, fuzzy matching and inserts. Large histories use a Bloom filter.
+v.2026-10-18
+"""
+import hashlib
+import math
+from collections import Counter
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings. `in` may return false positives at about `error_rate`, never false negatives.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(capacity, 1)
+        self.bit_count = int(-capacity * math.log(error_rate) / math.log(2) ** 2) + 1
+        self.hash_count = max(int(self.bit_count / capacity * math.log(2)), 1)
+        self.bits = bytearray(self.bit_count // 8 + 1)
+
+    def _positions(self, key):
+        digest = hashlib.md5(key.encode()).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little')
+        return ((h1 + idx * h2) % self.bit_count for idx in range(self.hash_count))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class KnownIdIndex:
+    """
+    Set of known `_id` and url keys, with counters of how many entries were skipped at each step.
+    """
+
+    def __init__(self, keys, bloom_threshold=500000):
+        keys = list(keys)
+
+        if len(keys) > bloom_threshold:
+            self.keys = BloomFilter(capacity=len(keys))
+            for key in keys:
+                self.keys.add(key)
+        else:
+            self.keys = set(keys)
+
+        self.key_count = len(keys)
+        self.checked_counts = Counter()
+        self.skipped_counts = Counter()
+        print(f"INFO  - Loaded {self.key_count} known keys into a {type(self.keys).__name__}")
+
+    @classmethod
+    def from_mongo(cls, mongo_cnx, collection_names, start_publish_date=None, bloom_threshold=500000):
+        """
+        Preload known keys of the given collections.
+
+        Args:
+            mongo_cnx (MongoCnx): Database connection.
+            collection_names (list): Collections with ingested articles, like 'news_unprocessed' and 'news'.
+            start_publish_date (datetime object): Only load documents published after this date.
+            bloom_threshold (int): Use a Bloom filter instead of a set above this number of keys.
+        """
+        keys = []
+        for collection_name in collection_names:
+            keys.extend(mongo_cnx.get_known_keys(collection_name, start_publish_date=start_publish_date))
+        return cls(keys, bloom_threshold=bloom_threshold)
+
+    def is_known(self, item):
+        return any(item.get(key) and item[key] in self.keys for key in ("_id", "url"))
+
+    def drop_known(self, news_obj_list, step):
+        """
+        Args:
+            news_obj_list (list): Extracted entries with "_id" and "url" keys.
+            step (str): Name of the pipeline step, used for the skip counters.
+
+        Returns:
+            list: Entries that are not known yet.
+        """
+        new_items = [item for item in news_obj_list if not self.is_known(item)]
+        self.checked_counts[step] += len(news_obj_list)
+        self.skipped_counts[step] += len(news_obj_list) - len(new_items)
+        print(f"INFO  - Skipped {len(news_obj_list) - len(new_items)}/{len(news_obj_list)} known entries on '{step}'")
+        return new_items
+
+    def report(self):
+        for step, checked_count in self.checked_counts.items():
+            print(f"INFO  - Known entries skipped on '{step}': {self.skipped_counts[step]}/{checked_count}")
+        print(f"INFO  - Total known entries skipped: {sum(self.skipped_counts.values())}")
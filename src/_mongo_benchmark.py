@@ -0,0 +1,129 @@
+"""
+Benchmark of `MongoCnx` writes against a local mongod, in documents per second.
+`insert_documents` is compared with the former loop of one `find_one` plus one `insert_one` per document. Each run
+inserts new documents and then the same documents again, so the duplicate path is measured too.
+`update_collection` is compared with the former loop of one `update_one` per document, upserting new documents and
+then updating the same documents, streamed from a generator.
+
+Usage:
+    python -m src._mongo_benchmark --uri mongodb://localhost:27017 --sizes 1000 10000 100000
+    python -m src._mongo_benchmark --write update
+v.2026-10-18
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from src._drv_mongodb import MongoCnx
+
+
+def make_documents(count, start=0):
+    """
+    Returns:
+    - list: Documents shaped like the stage 1 results, with string publish dates.
+    """
+    base_date = datetime(2026, 1, 1)
+    return [{
+        "_id": f"benchmark-{idx:08d}",
+        "url": f"https://www.example.com/articles/{idx}",
+        "domain": "www.example.com",
+        "title": f"Benchmark article {idx}",
+        "publish_date": (base_date + timedelta(minutes=idx)).isoformat(),
+        "status": "fetched",
+    } for idx in range(start, start + count)]
+
+
+def insert_one_by_one(mongo_cnx, collection_name, document_list):
+    # Former `insert_documents`: two round-trips per new document
+    collection = mongo_cnx.db[collection_name]
+    for document in document_list:
+        if collection.find_one({"_id": document["_id"]}) is None:
+            document["last_modified"] = datetime.now()
+            collection.insert_one(document)
+
+
+def update_one_by_one(mongo_cnx, collection_name, document_list):
+    # Former `update_collection`: one round-trip per document
+    collection = mongo_cnx.db[collection_name]
+    for document in document_list:
+        collection.update_one({"_id": document["_id"]},
+                              {"$set": document, "$currentDate": {"last_modified": {"$type": "date"}}}, upsert=True)
+
+
+def content_updates(count):
+    # Stage 2 like updates, as a generator
+    return ({"_id": f"benchmark-{idx:08d}", "content": "Benchmark content. " * 50, "status": "content_parsed"}
+            for idx in range(count))
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def benchmark_inserts(mongo_cnx, sizes=(1000, 10000, 100000), batch_size=1000, max_legacy_size=10000,
+                      collection_name="benchmark_inserts"):
+    """
+    Print documents per second of the bulk and the one-by-one inserts, for new and for duplicate documents.
+
+    Args:
+    - mongo_cnx (MongoCnx): Connection to a disposable database.
+    - sizes (tuple): Document counts.
+    - batch_size (int): Documents per `insert_many` call.
+    - max_legacy_size (int): Largest document count run with the one-by-one inserts, which are slow.
+    - collection_name (str): Scratch collection, dropped before each run.
+    """
+    collection = mongo_cnx.db[collection_name]
+    for size in sizes:
+        methods = {"bulk": lambda documents: mongo_cnx.insert_documents(collection_name, documents, batch_size)}
+        if size <= max_legacy_size:
+            methods["one-by-one"] = lambda documents: insert_one_by_one(mongo_cnx, collection_name, documents)
+
+        for name, insert in methods.items():
+            collection.drop()
+            new_seconds = timed(insert, make_documents(size))
+            duplicate_seconds = timed(insert, make_documents(size))
+            print(f"INFO  - {size:>7} documents, {name:>10}: {size / new_seconds:9.0f} docs/s new, "
+                  f"{size / duplicate_seconds:9.0f} docs/s duplicates")
+    collection.drop()
+
+
+def benchmark_updates(mongo_cnx, sizes=(1000, 10000, 100000), batch_size=1000, max_legacy_size=10000,
+                      collection_name="benchmark_updates"):
+    """
+    Print documents per second of the bulk and the one-by-one upserts, for new and for existing documents.
+    Arguments are the same of `benchmark_inserts`.
+    """
+    collection = mongo_cnx.db[collection_name]
+    for size in sizes:
+        methods = {"bulk": lambda documents: mongo_cnx.update_collection(collection_name, documents, batch_size)}
+        if size <= max_legacy_size:
+            methods["one-by-one"] = lambda documents: update_one_by_one(mongo_cnx, collection_name, documents)
+
+        for name, update in methods.items():
+            collection.drop()
+            new_seconds = timed(update, content_updates(size))
+            existing_seconds = timed(update, content_updates(size))
+            print(f"INFO  - {size:>7} documents, {name:>10}: {size / new_seconds:9.0f} docs/s upserted, "
+                  f"{size / existing_seconds:9.0f} docs/s updated")
+    collection.drop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Mongodb writes of MongoCnx")
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--database", default="news_benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--max-legacy-size", type=int, default=10000)
+    parser.add_argument("--write", choices=["insert", "update", "all"], default="all")
+    args = parser.parse_args()
+
+    benchmark_cnx = MongoCnx(args.database, uri=args.uri)
+    if args.write in ("insert", "all"):
+        benchmark_inserts(benchmark_cnx, sizes=args.sizes, batch_size=args.batch_size,
+                          max_legacy_size=args.max_legacy_size)
+    if args.write in ("update", "all"):
+        benchmark_updates(benchmark_cnx, sizes=args.sizes, batch_size=args.batch_size,
+                          max_legacy_size=args.max_legacy_size)
@@ -0,0 +1,184 @@
+"""
+Re-extract article contents from archived pages with the current selector rules, e.g. after a selector changed.
+Pages are split in chunks over a process pool, so parsing uses all cores. Each process opens its own archive reader
+and builds the selector registry from the rules sent by the parent, with no database traffic per page.
+New contents are cleaned like stage 2 contents and bulk-written back to Mongodb. Pages that fail to parse are counted
+and skipped.
+
+Usage:
+    python -m src._reextract --collection news_unprocessed --domain wsj.com --domain ft.com
+    python -m src._reextract --collection news --benchmark
+v.2026-10-18
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pymongo import UpdateOne
+
+from src._archive import HtmlArchive
+from src._drv_mongodb import MongoCnx
+from src._html_parsers import get_parser
+from src._selectors import ARTICLE_SELECTORS, SelectorRegistry
+from src._text import clean_paragraphs
+
+# Per-process state, set by `_init_worker`
+_worker = {}
+
+
+def _init_worker(archive_path, rules, parser_name):
+    _worker["archive"] = HtmlArchive(archive_path)
+    _worker["registry"] = SelectorRegistry.from_rules(rules, defaults=ARTICLE_SELECTORS)
+    _worker["parser"] = get_parser(parser_name)
+
+
+def extract_chunk(chunk):
+    """
+    Args:
+    - chunk (list): `(_id, domain)` tuples of archived pages.
+
+    Returns:
+    - list: `(_id, content, error)` tuples, with content None when no selector matched or the page failed.
+    """
+    archive, registry, parser = _worker["archive"], _worker["registry"], _worker["parser"]
+    results = []
+    for _id, domain in chunk:
+        try:
+            html = archive.get(_id)
+            text = None
+            if html is not None:  # Same selector order as stage 2
+                text = registry.extract_text(parser, parser.parse(html), domain, static_first=True)
+            # Same format stored by stage 2
+            results.append((_id, clean_paragraphs(text) if text else None, None))
+        except Exception as e:  # One malformed page must not stop the chunk
+            results.append((_id, None, f"{type(e).__name__}: {e}"))
+    return results
+
+
+def list_archived_articles(mongo_cnx, archive, collection_name, domains=None):
+    """
+    Returns:
+    - list: `(_id, domain)` of articles on the collection with an archived page.
+    """
+    query = {"domain": {"$in": domains}} if domains else {}
+    articles = {document["_id"]: document.get("domain")
+                for document in mongo_cnx.db[collection_name].find(query, {"_id": 1, "domain": 1})}
+    archived_ids = archive.existing_ids(articles)
+    return [(_id, articles[_id]) for _id in sorted(archived_ids)]
+
+
+def run_extraction(tasks, archive_path, rules, parser_name, max_workers, chunk_size):
+    """
+    Yield `(_id, content, error)` of every task, as chunks complete.
+    """
+    chunks = [tasks[start:start + chunk_size] for start in range(0, len(tasks), chunk_size)]
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(archive_path, rules, parser_name)) as executor:
+        futures = {executor.submit(extract_chunk, chunk): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            try:
+                yield from future.result()
+            except Exception as e:  # Worker process died, the other chunks go on
+                error = f"{type(e).__name__}: {e}"
+                yield from ((_id, None, error) for _id, _ in futures[future])
+
+
+def reextract(collection_name, domains=None, archive_path="./html_archive", parser_name="html.parser",
+              max_workers=None, chunk_size=100, batch_size=1000, dry_run=False):
+    """
+    Re-extract contents of archived pages and write the changed ones back to Mongodb.
+
+    Args:
+    - collection_name (str): Collection with the articles.
+    - domains (list): Only re-extract these domains.
+    - archive_path (str): `HtmlArchive` folder.
+    - parser_name (str): HTML parser backend.
+    - max_workers (int): Processes. Defaults to the number of cores.
+    - chunk_size (int): Pages per task sent to a process.
+    - batch_size (int): Updates per Mongodb bulk write.
+    - dry_run (bool): Extract without writing to Mongodb.
+
+    Returns:
+    - float: Pages per second.
+    """
+    mongo_cnx = MongoCnx("news_db")
+    archive = HtmlArchive(archive_path)
+    tasks = list_archived_articles(mongo_cnx, archive, collection_name, domains)
+    archive.close()
+    rules = SelectorRegistry.load_rules(mongo_cnx)
+    max_workers = max_workers or os.cpu_count()
+    print(f"INFO  - Re-extracting {len(tasks)} archived pages of '{collection_name}' with {max_workers} processes")
+
+    collection = mongo_cnx.db[collection_name]
+    updates, missing_count, failed_count, modified_count = [], 0, 0, 0
+    start = time.perf_counter()
+
+    def flush():
+        nonlocal modified_count
+        if updates and not dry_run:
+            modified_count += collection.bulk_write(updates, ordered=False).modified_count
+        updates.clear()
+
+    for idx, (_id, content, error) in enumerate(
+            run_extraction(tasks, archive_path, rules, parser_name, max_workers, chunk_size), start=1):
+        if error is not None:
+            print(f"ERROR - Could not re-extract {_id}: {error}")
+            failed_count += 1
+        elif content is None:
+            missing_count += 1
+        else:
+            updates.append(UpdateOne({"_id": _id}, {"$set": {"content": content},
+                                                    "$currentDate": {"last_modified": {"$type": "date"}}}))
+        if len(updates) >= batch_size:
+            flush()
+        if idx % 1000 == 0:
+            print(f"INFO  - {idx}/{len(tasks)} pages, {idx / (time.perf_counter() - start):.1f} pages/s")
+    flush()
+
+    elapsed = time.perf_counter() - start
+    pages_per_second = len(tasks) / elapsed if elapsed else 0
+    print(f"INFO  - Re-extracted {len(tasks)} pages in {elapsed:.1f}s ({pages_per_second:.1f} pages/s), "
+          f"{missing_count} without article element, {failed_count} failed, {modified_count} contents changed"
+          f"{' (dry run)' if dry_run else ''}")
+    return pages_per_second
+
+
+def benchmark_scaling(tasks, archive_path, rules, parser_name, chunk_size=100):
+    """
+    Extract the same pages with 1, 2, 4... processes up to the core count, and print pages/s and speedup.
+    """
+    worker_counts = sorted({min(2 ** power, os.cpu_count()) for power in range(os.cpu_count().bit_length() + 1)})
+    base_rate = None
+    for max_workers in worker_counts:
+        start = time.perf_counter()
+        page_count = sum(1 for _ in run_extraction(tasks, archive_path, rules, parser_name, max_workers, chunk_size))
+        rate = page_count / (time.perf_counter() - start)
+        base_rate = base_rate or rate
+        print(f"INFO  - {max_workers:>3} processes: {rate:8.1f} pages/s, speedup {rate / base_rate:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-extract article contents from archived pages")
+    parser.add_argument("--collection", default="news_unprocessed")
+    parser.add_argument("--domain", action="append", dest="domains", help="Domain to re-extract, repeatable")
+    parser.add_argument("--archive", default="./html_archive")
+    parser.add_argument("--parser", default=os.getenv("HTML_PARSER", "html.parser"))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="Extract without writing to Mongodb")
+    parser.add_argument("--benchmark", action="store_true", help="Compare pages/s by number of processes")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        mongo_cnx = MongoCnx("news_db")
+        html_archive = HtmlArchive(args.archive)
+        archived_tasks = list_archived_articles(mongo_cnx, html_archive, args.collection, args.domains)
+        html_archive.close()
+        benchmark_scaling(archived_tasks, args.archive, SelectorRegistry.load_rules(mongo_cnx), args.parser,
+                          chunk_size=args.chunk_size)
+    else:
+        reextract(args.collection, domains=args.domains, archive_path=args.archive, parser_name=args.parser,
+                  max_workers=args.workers, chunk_size=args.chunk_size, batch_size=args.batch_size,
+                  dry_run=args.dry_run)
@@ -0,0 +1,111 @@
+"""
+Per-domain rate limiting for page scraping.
+Each domain gets a token bucket (requests per minute), and work is interleaved across domains so each one stays
+polite while the total throughput is only bounded by the slowest domain's rate.
+Concurrent workers call `acquire` right before each request, so queued items can't fire back-to-back when workers
+free up. Rates are read from the `crawl_rate` field of the `sources` and `selectors` collections, and must be positive.
+v.2026-10-18
+"""
+import random
+import threading
+import time
+from collections import deque
+
+
+class TokenBucket:
+
+    def __init__(self, rate_per_minute, burst=1):
+        self.rate = rate_per_minute / 60
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        """Seconds until a token is available."""
+        self._refill()
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self._refill()
+        self.tokens -= 1
+
+
+class DomainScheduler:
+    """
+    Thread-safe set of token buckets keyed by domain.
+    """
+
+    def __init__(self, rates=None, default_rate=2, burst=1, jitter=0.25):
+        """
+        Args:
+        - rates (dict): Requests per minute by domain, like {"wsj.com": 3}.
+        - default_rate (float): Requests per minute for domains without a configured rate.
+        - burst (int): Requests allowed back-to-back after an idle period.
+        - jitter (float): Random extra wait, as a fraction of the domain interval, to avoid a fixed cadence.
+        """
+        all_rates = {**(rates or {}), "default": default_rate}
+        invalid_rates = {domain: rate for domain, rate in all_rates.items() if rate <= 0}
+        if invalid_rates:
+            raise ValueError(f"Crawl rates must be positive requests per minute, got {invalid_rates}")
+
+        self.rates = rates or {}
+        self.default_rate = default_rate
+        self.burst = burst
+        self.jitter = jitter
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_mongo(cls, mongo_cnx, default_rate=2, **kwargs):
+        rates = {}
+        for collection_name in ["sources", "selectors"]:  # Rates on `selectors` override `sources`
+            query = {"crawl_rate": {"$exists": True}}
+            for document in mongo_cnx.db[collection_name].find(query, {"domain": 1, "crawl_rate": 1}):
+                domain, rate = document["domain"].replace("www.", ""), float(document["crawl_rate"])
+                if rate <= 0:
+                    print(f"ERROR - Ignoring crawl_rate {rate} of '{domain}' on '{collection_name}', must be positive")
+                    continue
+                rates[domain] = rate
+
+        print(f"INFO  - Loaded crawl rates (requests/minute) {rates}, default {default_rate}")
+        return cls(rates, default_rate=default_rate, **kwargs)
+
+    def _get_bucket(self, domain):
+        if domain not in self._buckets:
+            self._buckets[domain] = TokenBucket(self.rates.get(domain, self.default_rate), self.burst)
+        return self._buckets[domain]
+
+    def _jitter_time(self, domain):
+        return random.uniform(0, self.jitter * 60 / self.rates.get(domain, self.default_rate))
+
+    def acquire(self, domain):
+        """
+        Block until a request to `domain` is allowed.
+        """
+        while True:
+            with self._lock:
+                bucket = self._get_bucket(domain)
+                wait_time = bucket.wait_time()
+                if wait_time <= 0:
+                    bucket.consume()
+                    return
+            time.sleep(wait_time + self._jitter_time(domain))
+
+    def interleave(self, items, domain_getter=lambda item: item["domain"]):
+        """
+        Yield items alternating domains, without waiting. Meant for workers that `acquire` before each request.
+        """
+        queues = {}
+        for item in items:
+            queues.setdefault(domain_getter(item), deque()).append(item)
+
+        while queues:
+            for domain in list(queues):
+                yield queues[domain].popleft()
+                if not queues[domain]:
+                    del queues[domain]
@@ -0,0 +1,129 @@
+"""
+Article body selectors by domain, loaded once per run from the `selectors` collection and compiled to CSS.
+Rules on Mongodb look like {"domain": "www.msn.com", "selector": "class", "element": "div", "class": "article"}, with
+"selector" one of 'element', 'class', 'id', 'data-test' or 'css'. An optional "fallbacks" list holds more rules, tried
+in order. Rules add to the static selectors of a domain: the browser pages of stage 2 try the static selectors first,
+as before the registry, and the Mongodb rules after them. Other callers try the rules first.
+v.2026-10-18
+"""
+
+# Static CSS selectors of the article body, in order of preference, tried after the rules on Mongodb
+ARTICLE_SELECTORS = {
+    "wsj.com": ["article", "section"],
+    "ft.com": ["article", "#article-body", "section"],
+}
+
+
+def css_string(value):
+    """
+    Quote a rule value for a CSS attribute selector.
+    """
+    return '"' + str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\a ') + '"'
+
+
+def compile_rule(rule):
+    """
+    Args:
+    - rule (dict or str): Selector rule, or a CSS selector.
+
+    Returns:
+    - str: CSS selector.
+    """
+    if isinstance(rule, str):
+        return rule
+
+    element = rule.get("element") or ""
+    kind = rule["selector"]
+    if kind == "element":
+        return element
+    if kind == "class":
+        return f'{element}[class*={css_string(rule["class"])}]'
+    if kind == "id":
+        return f'{element}[id={css_string(rule["id"])}]'
+    if kind == "data-test":
+        return f'{element}[data-test={css_string(rule["data-test"])}]'
+    if kind == "css":
+        return rule["css"]
+    raise ValueError(f"Unknown selector rule '{kind}' for domain {rule.get('domain')}")
+
+
+def normalize_domain(domain):
+    return (domain or "").replace("www.", "")
+
+
+class SelectorRegistry:
+    """
+    Ordered CSS selectors by domain. Extraction is a dict lookup plus the parser's cached compiled selectors.
+    """
+
+    def __init__(self, selectors_by_domain, default_selectors=("article",), static_by_domain=None):
+        """
+        Args:
+        - selectors_by_domain (dict): CSS selectors of the rules by domain, in order of preference.
+        - default_selectors (tuple): Selectors of domains without rules.
+        - static_by_domain (dict): Static CSS selectors by domain, like `ARTICLE_SELECTORS`.
+        """
+        rules_by_domain = {normalize_domain(domain): list(selectors) for domain, selectors in
+                           selectors_by_domain.items()}
+        static_by_domain = {normalize_domain(domain): list(selectors) for domain, selectors in
+                            (static_by_domain or {}).items()}
+        domains = set(rules_by_domain) | set(static_by_domain)
+
+        # Repeated selectors keep their first position
+        self.selectors_by_domain = {
+            domain: tuple(dict.fromkeys(rules_by_domain.get(domain, []) + static_by_domain.get(domain, [])))
+            for domain in domains}
+        self.static_first_by_domain = {
+            domain: tuple(dict.fromkeys(static_by_domain.get(domain, []) + rules_by_domain.get(domain, [])))
+            for domain in domains}
+        self.default_selectors = tuple(default_selectors)
+
+    @classmethod
+    def from_rules(cls, rules, defaults=None, **kwargs):
+        """
+        Build the registry from selector rules, like the documents of the `selectors` collection. Rules are plain
+        dicts, so they can be sent to worker processes to build the same registry there.
+
+        Args:
+        - rules (list): Selector rules with "domain" and optional "fallbacks".
+        - defaults (dict): Static CSS selectors by domain, added to the rules.
+        """
+        selectors_by_domain = {}
+        for rule in rules:
+            selectors = selectors_by_domain.setdefault(normalize_domain(rule["domain"]), [])
+            for fallback_rule in [rule] + list(rule.get("fallbacks", [])):
+                selectors.append(compile_rule(fallback_rule))
+        return cls(selectors_by_domain, static_by_domain=defaults, **kwargs)
+
+    @classmethod
+    def load_rules(cls, mongo_cnx):
+        return list(mongo_cnx.db["selectors"].find({"selector": {"$exists": True}}, {"_id": 0, "crawl_rate": 0}))
+
+    @classmethod
+    def from_mongo(cls, mongo_cnx, defaults=None, **kwargs):
+        rules = cls.load_rules(mongo_cnx)
+        registry = cls.from_rules(rules, defaults=defaults, **kwargs)
+        print(f"INFO  - Loaded {len(rules)} selector rules for {len(registry.selectors_by_domain)} domains")
+        return registry
+
+    def selectors_for(self, domain, static_first=False):
+        """
+        Args:
+        - domain (str): Article domain.
+        - static_first (bool): Try the static selectors of the domain before the rules.
+        """
+        selectors_by_domain = self.static_first_by_domain if static_first else self.selectors_by_domain
+        return selectors_by_domain.get(normalize_domain(domain), self.default_selectors)
+
+    def extract_text(self, parser, document, domain, static_first=False):
+        """
+        Args:
+        - parser (object): HTML parser backend of `src._html_parsers`.
+        - document (object): Page parsed by `parser`.
+        - domain (str): Article domain.
+        - static_first (bool): Try the static selectors of the domain before the rules.
+
+        Returns:
+        - str: Text of the first non-empty match, or None.
+        """
+        return parser.select_text(document, self.selectors_for(domain, static_first))
@@ -0,0 +1,174 @@
+"""
+Login sessions of paywalled domains kept between runs, so the browser login only runs when a session expired.
+Cookies and local storage of each domain are saved after a successful login, encrypted at rest with Fernet and the
+`SESSION_KEY` environment variable (create one with `Fernet.generate_key()`).
+A saved session is validated once per run with a plain HTTP probe of an account page, which only logged-in users can
+open: without a valid session it redirects to the login or SSO host. A new login is checked on the browser the same
+way before it is saved and shared with the other workers.
+v.2026-10-18
+"""
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from cryptography.fernet import Fernet, InvalidToken
+
+COOKIE_FIELDS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite')
+
+
+def is_on_probe_host(url, probe_url):
+    # Logged-out requests of the account page end on the login or SSO host instead
+    return urlparse(url).hostname == urlparse(probe_url).hostname
+
+
+class LoginSessionStore:
+    """
+    Encrypted file with the session state of each domain, like {"wsj.com": {"cookies": [...], "local_storage": {...},
+    "saved_at": 1697000000}}. Methods are thread-safe, to be shared by browser pool workers.
+    """
+
+    def __init__(self, key, file_path="./json_files/login_sessions.bin", max_age_hours=72):
+        """
+        Args:
+        - key (str): Fernet key, like the `SESSION_KEY` environment variable.
+        - file_path (str): Encrypted session file.
+        - max_age_hours (float): Saved sessions older than this are not probed and need a new login.
+        """
+        self.fernet = Fernet(key)
+        self.file_path = file_path
+        self.max_age_hours = max_age_hours
+        self._lock = threading.Lock()
+        self._domain_locks = {}
+        self._valid_domains = {}
+        self._data = {}
+
+        if os.path.exists(file_path):
+            try:
+                with open(file_path, "rb") as file:
+                    self._data = json.loads(self.fernet.decrypt(file.read()))
+            except (OSError, ValueError, InvalidToken) as e:
+                print(f"ERROR - Could not load login sessions from '{file_path}', logging in again: {e}")
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """
+        Returns:
+        - LoginSessionStore, or None when `SESSION_KEY` is not set and sessions can not be persisted.
+        """
+        key = os.getenv('SESSION_KEY')
+        if not key:
+            print("INFO  - SESSION_KEY not set, login sessions will not be saved between runs")
+            return None
+        return cls(key, **kwargs)
+
+    def _save(self):
+        temp_path = f"{self.file_path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(self.fernet.encrypt(json.dumps(self._data).encode()))
+        os.replace(temp_path, self.file_path)
+
+    def domain_lock(self, domain):
+        """Lock held by the worker logging in to `domain`, so the other workers restore its session."""
+        with self._lock:
+            return self._domain_locks.setdefault(domain, threading.Lock())
+
+    def is_valid(self, domain, probe_url):
+        """
+        Check if the saved session of `domain` is still logged in. The probe runs once per domain and run.
+
+        Args:
+        - domain (str): Domain, like "wsj.com".
+        - probe_url (str): Account page, which redirects to another host when the cookies are not logged in.
+        """
+        if domain in self._valid_domains:
+            return self._valid_domains[domain]
+
+        state = self._data.get(domain)
+        if state is None:
+            is_valid = False
+        elif time.time() - state["saved_at"] > self.max_age_hours * 3600:
+            print(f"INFO  - Saved session of '{domain}' is older than {self.max_age_hours}h")
+            is_valid = False
+        else:
+            session = requests.Session()
+            session.headers['User-Agent'] = state.get("user_agent", "")
+            for cookie in state["cookies"]:
+                session.cookies.set(cookie['name'], cookie['value'], domain=cookie['domain'], path=cookie['path'])
+            try:
+                response = session.get(probe_url, timeout=15)
+                is_valid = response.ok and is_on_probe_host(response.url, probe_url)
+            except requests.RequestException as e:
+                print(f"ERROR - Session probe of '{domain}' failed: {e}")
+                is_valid = False
+
+        print(f"INFO  - Saved session of '{domain}' is {'valid' if is_valid else 'expired or missing'}")
+        self._valid_domains[domain] = is_valid
+        return is_valid
+
+    @staticmethod
+    def is_logged_in(driver, probe_url):
+        """
+        Check the login of a browser by opening the account page.
+        """
+        driver.get(probe_url)
+        return is_on_probe_host(driver.current_url, probe_url)
+
+    def capture(self, domain, driver, origin_url, probe_url, cookie_domains=None):
+        """
+        Save cookies and local storage of a logged-in browser. Nothing is saved when the login failed.
+
+        Args:
+        - domain (str): Domain, like "wsj.com".
+        - driver (object): Selenium Chrome webdriver object.
+        - origin_url (str): Page of the domain, to read its local storage.
+        - probe_url (str): Account page, to check the login first.
+        - cookie_domains (list): Cookie domains of the session, like the SSO domain. Defaults to `[domain]`.
+
+        Returns:
+        - bool: True when the session was saved.
+        """
+        if not self.is_logged_in(driver, probe_url):
+            print(f"ERROR - Login to '{domain}' failed, session not saved")
+            with self._lock:
+                self._valid_domains[domain] = False
+            return False
+
+        cookie_domains = cookie_domains or [domain]
+        cookies = [
+            {field: cookie[field] for field in COOKIE_FIELDS + ('expires',) if field in cookie}
+            for cookie in driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']
+            if any(cookie['domain'].lstrip('.').endswith(cookie_domain) for cookie_domain in cookie_domains)
+        ]
+
+        driver.get(origin_url)
+        local_storage = driver.execute_script('return Object.assign({}, window.localStorage);')
+
+        with self._lock:
+            self._data[domain] = {
+                "cookies": cookies,
+                "local_storage": local_storage,
+                "user_agent": driver.execute_script('return navigator.userAgent;'),
+                "saved_at": time.time(),
+            }
+            self._valid_domains[domain] = True
+            self._save()
+        print(f"INFO  - Saved session of '{domain}' with {len(cookies)} cookies and {len(local_storage)} storage keys")
+        return True
+
+    def restore(self, domain, driver, origin_url):
+        """
+        Load a saved session on a browser, instead of logging in.
+        """
+        state = self._data[domain]
+        cookies = [{field: value for field, value in cookie.items() if field != 'expires' or value > 0}  # Session
+                   for cookie in state["cookies"]]
+        driver.execute_cdp_cmd('Network.setCookies', {'cookies': cookies})
+
+        driver.get(origin_url)
+        driver.execute_script(
+            'for (const [key, value] of Object.entries(arguments[0])) { window.localStorage.setItem(key, value); }',
+            state["local_storage"])
+        print(f"INFO  - Restored saved session of '{domain}'")
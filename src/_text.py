@@ -0,0 +1,190 @@
+"""
+Article text normalization before OpenAI calls.
+`clean_text` keeps the output of the former per-script copies (single spaces, printable ASCII only) with a
+`str.translate` core, and maps typographic quotes and dashes to ASCII instead of dropping them.
+`TextNormalizer` also drops boilerplate lines ("Advertisement", share bars, newsletter sign-ups, "Read more") with
+static patterns and per-domain lines learned from repeated lines across stored article contents, and reports the
+token count of each article before and after.
+Both work on lines, so stage 2 stores contents with `clean_paragraphs`: one cleaned line per block element of the
+article. Contents stored as a single line by older runs get line breaks back with `python -m src._reextract`.
+
+Usage:
+    python -m src._text learn --collection news --collection news_unprocessed
+v.2026-10-18
+"""
+import argparse
+import re
+from collections import Counter, defaultdict
+
+from src._caches import PersistentStore
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+_encodings = {}
+
+TYPOGRAPHIC_TABLE = str.maketrans({
+    "\u2018": "'", "\u2019": "'", "\u201a": "'", "\u201c": '"', "\u201d": '"', "\u201e": '"',
+    "\u2013": "-", "\u2014": "-", "\u2212": "-", "\u2026": "...",
+})
+# ASCII control characters, not in `string.printable`. Whitespace controls are removed by the split before.
+CONTROL_PATTERN = re.compile(r"[\x00-\x08\x0e-\x1f\x7f]")
+
+MAX_BOILERPLATE_LENGTH = 200
+# Whole boilerplate lines, lowercase. Sentences starting with the same words are kept.
+BOILERPLATE_PATTERNS = re.compile(r"|".join([
+    r"^advertisement$",
+    r"^(continue|keep) reading( (the|this) (main )?(story|article))?\W*$",
+    r"^(read|see) (more|also|next)\W*$",
+    r"^(read|see) (more|also|next)\s*:.*$",
+    r"^(sign up|subscribe)\b[\w\s'-]{0,60}\b(newsletters?|briefings?)\W*$",
+    r"^share (this( article| story)?|on (facebook|twitter|x|linkedin|whatsapp|email))\W*$",
+    r"^(copy link|link copied|print this article|save this article)$",
+    r"^(copyright\s*)?(©|\(c\)|copyright)\s*\d{4}\b[\w\s.,&'-]{0,60}$",
+    r"^\d{4}\b[\w\s.,&'-]{0,60}\ball rights reserved\W*$",  # Notice with "©" dropped by `clean_text`
+    r"^(most popular|most read|recommended|recommended stories|related (articles|stories|content))\W*$",
+    r"^more from( [\w.'&-]+){1,3}$",
+]))
+
+
+def clean_text(text_str):
+    text_str = " ".join(text_str.split())
+    if not text_str.isascii():
+        text_str = text_str.translate(TYPOGRAPHIC_TABLE).encode("ascii", "ignore").decode("ascii")
+    return CONTROL_PATTERN.sub("", text_str)
+
+
+def clean_paragraphs(text_str):
+    """
+    `clean_text` of each line, without the empty ones. Stored article contents keep this format.
+    """
+    return "\n".join(line for line in map(clean_text, text_str.splitlines()) if line)
+
+
+def normalize_line(line):
+    return " ".join(line.lower().split())
+
+
+def count_tokens(text):
+    """
+    Tokens of `gpt-3.5-turbo` when `tiktoken` is installed, otherwise an estimate of 4 characters per token.
+    """
+    if tiktoken is not None and "encoding" not in _encodings:
+        try:
+            _encodings["encoding"] = tiktoken.encoding_for_model("gpt-3.5-turbo")
+        except Exception as e:  # BPE file is downloaded on first use
+            print(f"ERROR - Could not load tiktoken encoding, estimating tokens: {e}")
+            _encodings["encoding"] = None
+
+    encoding = _encodings.get("encoding")
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def learn_boilerplate(texts_by_domain, min_count=5, min_share=0.05):
+    """
+    Find lines repeated across many articles of a domain.
+
+    Args:
+    - texts_by_domain (dict): Article contents by domain.
+    - min_count (int): Articles a line must appear on to be boilerplate.
+    - min_share (float): Share of the domain's articles a line must appear on to be boilerplate.
+
+    Returns:
+    - dict: Normalized boilerplate lines by domain.
+    """
+    rules = {}
+    for domain, texts in texts_by_domain.items():
+        line_counts = Counter()
+        for text in texts:
+            lines = {normalize_line(line) for line in text.splitlines()}
+            line_counts.update(line for line in lines if 0 < len(line) <= MAX_BOILERPLATE_LENGTH)
+
+        threshold = max(min_count, min_share * len(texts))
+        rules[domain] = sorted(line for line, count in line_counts.items() if count >= threshold)
+    return rules
+
+
+class TextNormalizer:
+    """
+    Boilerplate stripping plus `clean_text`, with token counters.
+    """
+
+    def __init__(self, rules=None):
+        """
+        Args:
+        - rules (dict): Normalized boilerplate lines by domain, from `learn_boilerplate`.
+        """
+        self.rules = {domain: set(lines) for domain, lines in (rules or {}).items()}
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    @classmethod
+    def from_file(cls, file_path="./json_files/boilerplate_rules.json"):
+        return cls(dict(PersistentStore(file_path).items()))
+
+    def strip_boilerplate(self, text, domain=None):
+        domain_lines = self.rules.get((domain or "").replace("www.", ""), set())
+        kept_lines = []
+        for line in text.splitlines():
+            normalized = normalize_line(line)
+            if normalized in domain_lines:
+                continue
+            if len(normalized) <= MAX_BOILERPLATE_LENGTH and BOILERPLATE_PATTERNS.search(normalized):
+                continue
+            kept_lines.append(line)
+        return "\n".join(kept_lines)
+
+    def normalize(self, text, domain=None):
+        """
+        Returns:
+        - str: Text without boilerplate lines, on a single line of printable ASCII.
+        """
+        cleaned_text = clean_text(self.strip_boilerplate(text, domain))
+
+        tokens_before, tokens_after = count_tokens(text), count_tokens(cleaned_text)
+        self.tokens_before += tokens_before
+        self.tokens_after += tokens_after
+        print(f"INFO  - Tokens {tokens_before} -> {tokens_after} "
+              f"({(tokens_after - tokens_before) / max(tokens_before, 1):+.0%})")
+        return cleaned_text
+
+    def report(self):
+        saved = self.tokens_before - self.tokens_after
+        print(f"INFO  - Input tokens {self.tokens_before} -> {self.tokens_after}, saved {saved} "
+              f"({saved / max(self.tokens_before, 1):.0%})")
+
+
+def learn_from_mongo(mongo_cnx, collection_names, file_path="./json_files/boilerplate_rules.json", **kwargs):
+    """
+    Learn boilerplate lines from the contents stored on Mongodb and save them for `TextNormalizer.from_file`.
+    """
+    texts_by_domain = defaultdict(list)
+    for collection_name in collection_names:
+        query = {"content": {"$exists": True, "$type": "string"}}
+        for document in mongo_cnx.db[collection_name].find(query, {"domain": 1, "content": 1}):
+            texts_by_domain[(document.get("domain") or "").replace("www.", "")].append(document["content"])
+
+    rules = learn_boilerplate(texts_by_domain, **kwargs)
+    store = PersistentStore(file_path)
+    for domain, lines in rules.items():
+        store.set(domain, lines)
+        print(f"INFO  - {domain}: {len(lines)} boilerplate lines from {len(texts_by_domain[domain])} articles")
+    store.save()
+    return rules
+
+
+if __name__ == "__main__":
+    from src._drv_mongodb import MongoCnx
+
+    parser = argparse.ArgumentParser(description="Text normalization tools")
+    parser.add_argument("command", choices=["learn"])
+    parser.add_argument("--collection", action="append", dest="collections", help="Collection, repeatable")
+    parser.add_argument("--min-count", type=int, default=5)
+    parser.add_argument("--min-share", type=float, default=0.05)
+    args = parser.parse_args()
+
+    learn_from_mongo(MongoCnx("news_db"), args.collections or ["news"], min_count=args.min_count,
+                     min_share=args.min_share)
@@ -0,0 +1,52 @@
+from src._dedup import cluster_near_duplicates, hamming_distance, normalize_title, simhash
+
+
+def test_different_companies_are_not_clustered():
+    news_obj_list = [
+        {"_id": "disney", "title": "Activist investor Trian pushes Disney for board seats"},
+        {"_id": "unilever", "title": "Activist investor Trian pushes Unilever for board seats"},
+    ]
+    # Close enough for SimHash alone
+    distance = hamming_distance(*(simhash(normalize_title(item["title"])) for item in news_obj_list))
+    representatives, members = cluster_near_duplicates(news_obj_list, max_distance=max(distance, 3))
+
+    assert members == []
+    assert [item["_id"] for item in representatives] == ["disney", "unilever"]
+    assert all("duplicate_of" not in item for item in news_obj_list)
+
+
+def test_syndicated_titles_are_clustered():
+    news_obj_list = [
+        {"_id": "wsj", "title": "Activist investor Trian pushes Disney for board seats - WSJ"},
+        {"_id": "reuters", "title": "Activist investor Trian pushes Disney for board seats | Reuters"},
+    ]
+    representatives, members = cluster_near_duplicates(news_obj_list)
+
+    assert [item["_id"] for item in representatives] == ["wsj"]
+    assert members[0]["duplicate_of"] == "wsj"
+
+
+def test_headline_after_dash_is_kept():
+    news_obj_list = [
+        {"_id": "loses", "title": "Activist fight at Trian vs Disney - Peltz loses vote"},
+        {"_id": "wins", "title": "Activist fight at Trian vs Disney - Peltz wins vote"},
+    ]
+    representatives, members = cluster_near_duplicates(news_obj_list, max_distance=8)
+
+    assert members == []
+    assert normalize_title(news_obj_list[0]["title"]) == news_obj_list[0]["title"]
+    assert normalize_title("Disney shareholders back Iger - Reuters") == "Disney shareholders back Iger"
+    assert normalize_title("Disney shareholders back Iger - Some Blog", publisher="Some Blog") == \
+        "Disney shareholders back Iger"
+
+
+def test_representative_is_on_a_preferred_domain():
+    news_obj_list = [
+        {"_id": "reuters", "domain": "reuters.com", "title": "Activist investor Trian pushes Disney for board seats"},
+        {"_id": "wsj", "domain": "wsj.com", "title": "Activist investor Trian pushes Disney for board seats"},
+    ]
+    representatives, members = cluster_near_duplicates(news_obj_list, preferred_domains=("wsj.com", "ft.com"))
+
+    assert [item["_id"] for item in representatives] == ["wsj"]
+    assert members[0]["duplicate_of"] == "wsj"
+    assert all(item["cluster_id"] == "wsj" for item in news_obj_list)
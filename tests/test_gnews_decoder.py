@@ -0,0 +1,19 @@
+import pytest
+
+from src._gnews_decoder import FIXTURES, GoogleNewsDecoder
+
+
+@pytest.mark.parametrize("token, expected_url", FIXTURES)
+def test_decode_fixtures(token, expected_url):
+    assert GoogleNewsDecoder().decode(f"https://news.google.com/rss/articles/{token}?oc=5") == expected_url
+
+
+def test_hits_and_misses_are_counted():
+    decoder = GoogleNewsDecoder()
+    for token, _ in FIXTURES:
+        decoder.decode(f"https://news.google.com/rss/articles/{token}?oc=5")
+    decoder.decode("https://www.wsj.com/articles/not-a-google-news-link")
+
+    expected_hits = len([expected_url for _, expected_url in FIXTURES if expected_url])
+    assert decoder.hit_count == expected_hits
+    assert decoder.miss_count == len(FIXTURES) - expected_hits + 1
@@ -0,0 +1,17 @@
+import pytest
+
+from src._html_parsers import PARSERS
+from src._text import clean_paragraphs
+
+HTML = "<html><body><article><p>The <a>Fed</a> raised.</p><ul><li>a</li></ul>tail<br>x</article></body></html>"
+
+
+@pytest.mark.parametrize("name", sorted(PARSERS))
+def test_block_elements_break_lines(name):
+    try:
+        parser = PARSERS[name]()
+    except ImportError:
+        pytest.skip(f"'{name}' backend is not installed")
+
+    text = parser.select_text(parser.parse(HTML), ["article"])
+    assert clean_paragraphs(text) == "The Fed raised.\na\ntail\nx"
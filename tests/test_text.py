@@ -0,0 +1,16 @@
+from src._text import TextNormalizer, clean_paragraphs
+
+
+def test_boilerplate_lines_are_stripped():
+    text = clean_paragraphs("The Fed raised rates.\nAdvertisement\nRead more: Markets rally\n"
+                            "© 2023 Dow Jones & Company, Inc. All Rights Reserved.")
+
+    assert TextNormalizer().normalize(text) == "The Fed raised rates."
+
+
+def test_sentences_starting_like_boilerplate_are_kept():
+    text = ("Recommended by analysts, the board approved the deal.\n"
+            "Copyright lawsuits against OpenAI keep piling up.\n"
+            "More from the interview, the CEO said margins would recover.")
+
+    assert TextNormalizer().normalize(text) == " ".join(text.splitlines())